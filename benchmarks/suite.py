@@ -0,0 +1,207 @@
+"""Seeded benchmarks of the engine's hot paths & of complete bot-vs-bot games.
+Each benchmark builds its inputs outside the timed region, runs a batch of operations, keeps the best of several
+repeats & reports ops/sec, plus the peak traced memory per op from one extra tracemalloc'd run.
+
+Run from the repo root:
+    python -m benchmarks.suite                       # print results
+    python -m benchmarks.suite --save                # also write them as the baseline
+    python -m benchmarks.suite --compare             # flag benchmarks slower than the baseline by > threshold
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from gamenacki.common.dealer import Dealer
+from gamenacki.common.piles import Hand
+from gamenacki.common.scorer import Ledger, Scorer, WinCondition
+from gamenacki.lostcitinacki.models.bitboard import BitState
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.piles import Deck
+from gamenacki.lostcitinacki.players import BotPlayer
+from gamenacki.lostcitinacki.simulation import simulate_game
+
+SEED = 20240101
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+
+Op = Callable[[], object]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """setup(rng) builds fresh inputs & returns the batch to time; batch performs n_ops operations"""
+    name: str
+    n_ops: int
+    setup: Callable[[random.Random], Op]
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    ops_per_sec: float
+    peak_bytes_per_op: float
+
+
+def mid_round_state(rng: random.Random, turns: int = 10) -> GameState:
+    """A seeded GameState up to turns turns into its first round, played by BotPlayer's policy"""
+    gs = GameState.create_game_state(2, 3, rng)
+    bot = BotPlayer(0, 'bench', pick_up_delay=0, rng=rng)
+    for _ in range(turns):
+        if gs.is_round_over:
+            break
+        gs.apply(bot.choose_move(gs))
+    return gs
+
+
+def _states_with_moves(rng: random.Random, n: int):
+    gs = mid_round_state(rng)
+    turn_idx = gs.dealer.player_turn_idx
+    moves = gs.legal_moves(turn_idx)
+    return [(gs.clone(), rng.choice(moves)) for _ in range(n)], turn_idx
+
+
+def _setup_play_card_to(rng: random.Random) -> Op:
+    states, turn_idx = _states_with_moves(rng, 2000)
+    return lambda: [gs.play_card_to(turn_idx, m.card, m.play_to) for gs, m in states]
+
+
+def _setup_draw_from(rng: random.Random) -> Op:
+    states, turn_idx = _states_with_moves(rng, 2000)
+    for gs, m in states:
+        gs.play_card_to(turn_idx, m.card, m.play_to)
+    return lambda: [gs.draw_from(turn_idx, m.draw_from) for gs, m in states]
+
+
+def _setup_bit_state(rng: random.Random) -> Op:
+    gs = mid_round_state(rng, turns=20)
+    return lambda: [BitState.from_game_state(gs) for _ in range(2000)]
+
+
+def _setup_property(name: str) -> Callable[[random.Random], Op]:
+    def setup(rng: random.Random) -> Op:
+        gs = mid_round_state(rng)
+        return lambda: [getattr(gs, name) for _ in range(5000)]
+    return setup
+
+
+def _setup_expedition_points(rng: random.Random) -> Op:
+    gs = mid_round_state(rng, turns=20)
+    expeditions = [exp for board in gs.piles.exp_boards for exp in board]
+    return lambda: [exp.points for _ in range(500) for exp in expeditions]
+
+
+def _setup_deal(rng: random.Random) -> Op:
+    tables = [(Dealer(2, rng=rng), Deck(rng=rng), [Hand(), Hand()]) for _ in range(500)]
+    return lambda: [dealer.deal(deck, hands, 8) for dealer, deck, hands in tables]
+
+
+def _setup_get_winner(rng: random.Random) -> Op:
+    scorer = Scorer([Ledger([rng.randint(-60, 60) for _ in range(3)]) for _ in range(2)],
+                    WinCondition.HIGHEST_SCORE_W_TIES)
+    return lambda: [scorer.get_winner(True) for _ in range(5000)]
+
+
+def _bots(rng: random.Random) -> list[BotPlayer]:
+    return [BotPlayer(0, 'A', pick_up_delay=0, rng=rng), BotPlayer(1, 'B', pick_up_delay=0, rng=rng)]
+
+
+def _setup_full_game(rng: random.Random) -> Op:
+    seed = rng.randrange(1 << 30)
+    return lambda: [simulate_game(i, _bots, seed) for i in range(20)]
+
+
+BENCHMARKS = [
+    Benchmark('GameState.play_card_to', 2000, _setup_play_card_to),
+    Benchmark('GameState.draw_from', 2000, _setup_draw_from),
+    Benchmark('BitState.from_game_state', 2000, _setup_bit_state),
+    Benchmark('GameState.is_round_over', 5000, _setup_property('is_round_over')),
+    Benchmark('GameState.color_maxes', 5000, _setup_property('color_maxes')),
+    Benchmark('GameState.board_playable_cards', 5000, _setup_property('board_playable_cards')),
+    Benchmark('Expedition.points', 5000, _setup_expedition_points),
+    Benchmark('Dealer.deal', 500, _setup_deal),
+    Benchmark('Scorer.get_winner', 5000, _setup_get_winner),
+    Benchmark('bot-vs-bot full game', 20, _setup_full_game),
+]
+
+
+def run_benchmark(benchmark: Benchmark, repeats: int = 5) -> Result:
+    best = float('inf')
+    for repeat in range(repeats):
+        batch = benchmark.setup(random.Random(SEED + repeat))
+        start = time.perf_counter()
+        batch()
+        best = min(best, time.perf_counter() - start)
+    batch = benchmark.setup(random.Random(SEED))
+    tracemalloc.start()
+    batch()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(benchmark.name, benchmark.n_ops / best, peak / benchmark.n_ops)
+
+
+def run_suite(names: list[str] | None = None, repeats: int = 5) -> list[Result]:
+    return [run_benchmark(b, repeats) for b in BENCHMARKS if not names or b.name in names]
+
+
+def save_baseline(results: list[Result], path: Path) -> None:
+    payload = {'python': platform.python_version(), 'machine': platform.machine(),
+               'results': {r.name: {'ops_per_sec': r.ops_per_sec, 'peak_bytes_per_op': r.peak_bytes_per_op}
+                           for r in results}}
+    path.write_text(json.dumps(payload, indent=2) + '\n')
+
+
+def find_regressions(results: list[Result], path: Path, threshold: float) -> list[str]:
+    """Names of benchmarks whose ops/sec fell more than threshold (a fraction) below the baseline"""
+    baseline = json.loads(path.read_text())['results']
+    return [r.name for r in results
+            if r.name in baseline and r.ops_per_sec < baseline[r.name]['ops_per_sec'] * (1 - threshold)]
+
+
+def format_results(results: list[Result], baseline_path: Path | None = None) -> str:
+    baseline = json.loads(baseline_path.read_text())['results'] if baseline_path else {}
+    lines = [f"{'benchmark':<34}{'ops/sec':>14}{'peak B/op':>12}{'vs baseline':>14}"]
+    for r in results:
+        change = ''
+        if r.name in baseline:
+            change = f"{r.ops_per_sec / baseline[r.name]['ops_per_sec'] - 1:+.1%}"
+        lines.append(f"{r.name:<34}{r.ops_per_sec:>14,.0f}{r.peak_bytes_per_op:>12,.1f}{change:>14}")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help='write these results as the baseline')
+    parser.add_argument('--compare', action='store_true', help='exit 1 if any benchmark regressed')
+    parser.add_argument('--threshold', type=float, default=0.15, help='allowed slowdown, as a fraction')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('names', nargs='*', help='benchmarks to run; all by default')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.names, args.repeats)
+    has_baseline = args.baseline.exists()
+    print(format_results(results, args.baseline if has_baseline else None))
+    if args.compare:
+        if not has_baseline:
+            print(f"No baseline at {args.baseline}; run with --save first")
+            return 1
+        regressions = find_regressions(results, args.baseline, args.threshold)
+        for name in regressions:
+            print(f"REGRESSION: {name} is more than {args.threshold:.0%} slower than the baseline")
+        if regressions:
+            return 1
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
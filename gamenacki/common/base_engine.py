@@ -1,12 +1,13 @@
 """ABC engine that expects attributes: Player(s), Renderer, Log, and GameState.
 Its play method is what is run to play to the game.
+AsyncBaseEngine is the same for engines run on an asyncio event loop, with an async play method.
 """
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
 from gamenacki.common.log import Log
-from gamenacki.common.base_renderer import Renderer
+from gamenacki.common.base_renderer import AsyncRenderer, Renderer
 
 
 @dataclass
@@ -40,4 +41,23 @@ class BaseEngine(ABC):
                     break
                 game_state = self.create_new_round(game_state)
         """
-        ...
\ No newline at end of file
+        ...
+
+
+@dataclass
+class AsyncBaseEngine(ABC):
+    """BaseEngine for an asyncio event loop: players & the renderer are awaited, so one loop can interleave many
+    games while each waits on its players"""
+    players: list["AsyncPlayer"]
+    renderer: AsyncRenderer
+    gs: "GameState"
+    log: Log
+
+    @property
+    def player_cnt(self) -> int:
+        return len(self.players)
+
+    @abstractmethod
+    async def play(self) -> None:
+        """Plays the game to completion, as BaseEngine.play but awaiting each player move & render"""
+        ...
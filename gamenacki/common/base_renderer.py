@@ -14,3 +14,20 @@ class Renderer(metaclass=abc.ABCMeta):
     def render_log(self, log) -> None:
         """Render the game log.
         Parameters: log: Log"""
+
+
+class AsyncRenderer(metaclass=abc.ABCMeta):
+    """Renderer for engines run on an asyncio event loop; slow output (e.g. to a socket) is awaited, not blocked on"""
+    @abc.abstractmethod
+    async def render(self, game_state, players: list) -> None:
+        """Render the current game state & player information
+        Parameters: game_state: GameState, players: list[AsyncPlayer]"""
+
+    @abc.abstractmethod
+    async def render_error(self, exc: Exception) -> None:
+        """Render an exception"""
+
+    @abc.abstractmethod
+    async def render_log(self, log) -> None:
+        """Render the game log.
+        Parameters: log: Log"""
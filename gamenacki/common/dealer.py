@@ -1,22 +1,33 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import random
 
 from gamenacki.common.stack import Stack
 
 @dataclass
 class Dealer:
-    """A grouping of commonly-used Dealer methods, such as dealing, tracking turns, current player, etc"""
+    """A grouping of commonly-used Dealer methods, such as dealing, tracking turns, current player, etc
+    rng is the game's source of randomness; pass a seeded random.Random for reproducible games"""
     player_cnt: int
     dealer_idx: int = None
     player_turn_idx: int = None
     current_round_number = 1
+    rng: random.Random = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
+        if self.rng is None:
+            self.rng = random.Random()
         self.dealer_idx = self.select_random_p_idx()
         self.player_turn_idx = self.next_player_idx()
 
+    def reset(self, rng: random.Random | None = None) -> None:
+        """Back to round 1 with a newly chosen dealer, for a new game; rng, if given, replaces the game's rng"""
+        self.rng = rng or self.rng
+        self.current_round_number = 1
+        self.dealer_idx = self.select_random_p_idx()
+        self.set_player_idx_as_left_of_dealer()
+
     def select_random_p_idx(self):
-        return random.randint(0, self.player_cnt - 1)
+        return self.rng.randint(0, self.player_cnt - 1)
 
     def next_player_idx(self) -> int:
         if self.player_turn_idx is None:
@@ -36,5 +47,8 @@ class Dealer:
 
     def deal(self, source_pile: Stack, dest_piles: list[Stack], card_cnt: int, dealer_idx: int | None = None) -> None:
         dealer_idx = dealer_idx if dealer_idx is not None else self.dealer_idx
-        ordered_dest_piles = dest_piles[dealer_idx + 1 % len(dest_piles):] + dest_piles[:dealer_idx + 1]
-        [p.push(source_pile.pop()) for _ in range(card_cnt) for p in ordered_dest_piles]
+        start = (dealer_idx + 1) % len(dest_piles)
+        ordered_dest_piles = dest_piles[start:] + dest_piles[:start]
+        dealt = source_pile.pop_many(card_cnt * len(ordered_dest_piles))
+        for i, p in enumerate(ordered_dest_piles):
+            p.extend(dealt[i::len(ordered_dest_piles)])  # One card at a time around the table, as dealt by hand
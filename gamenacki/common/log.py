@@ -1,29 +1,127 @@
+"""The game log: compact per-action Events plus periodic state checkpoints.
+Events never reference the live game state. Instead the engine records enough to replay each action (player, card,
+destination, source) and stores a snapshot of the state every checkpoint_every events and whenever a round is dealt.
+state_at rebuilds the state after any event by restoring the nearest earlier checkpoint & replaying the events since,
+so at most checkpoint_every events are replayed.
+Events are immutable & interned as they're pushed, so a logged event costs one list slot & a game's log a few KB.
+A Log can also stream its events to an EventSink (e.g. a record file) as they happen, with or without keeping them.
+An engine can also show each event to EventObservers (e.g. a player's belief tracker) along with the game state."""
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, TypeVar
 
 from gamenacki.common.stack import Stack
 
 if TYPE_CHECKING:
-    from gamenacki.lostcitinacki.models.game_state import GameState
     from gamenacki.lostcitinacki.models.constants import Action
 
-@dataclass(frozen=True)
+S = TypeVar("S")  # the game-specific, replayable state rebuilt from a checkpoint
+
+
+@dataclass(frozen=True, slots=True)
 class Event:
-    game_state: "GameState"
     action: "Action"
     player_idx: int = None
-    attributes: dict = field(default_factory=dict)
-    timestamp: datetime = datetime.now()
+    card_idx: int = None
+    dest: str = None
+    source: str = None
 
     def __repr__(self) -> str:
-        return (f"Timestamp: {self.timestamp}\n"
-                f"Action: {self.action.name}\n"
+        return (f"Action: {self.action.name}\n"
                 f"Player ID: {self.player_idx}\n"
-                f"Game State: {self.game_state}\n"
-                f"Attributes: {self.attributes}\n")
+                f"Card ID: {self.card_idx}\n"
+                f"Destination: {self.dest}\n"
+                f"Source: {self.source}\n")
+
+
+_INTERNED_EVENTS: dict[Event, Event] = {}
+
+
+class EventSink(ABC):
+    """Receives a Log's events as they're pushed; one sink may receive many games in turn"""
+    @abstractmethod
+    def begin_game(self, seed: int | None) -> None:
+        ...
+
+    @abstractmethod
+    def write_event(self, event: Event) -> None:
+        ...
+
+    @abstractmethod
+    def end_game(self) -> None:
+        ...
+
+
+class EventObserver(ABC):
+    """Is shown each event an engine logs, with the game state it leaves; for in-process consumers that follow a
+    game as it's played rather than recording it"""
+    @abstractmethod
+    def observe(self, event: Event, gs) -> None:
+        ...
 
 
 @dataclass
 class Log(Stack):
-    events: list[Event] = field(default_factory=list)
+    seed: int = None
+    started_at: float = field(default_factory=time.time)
+    checkpoint_every: int = 32
+    sink: EventSink = field(default=None, repr=False, compare=False)
+    retain_events: bool = True
+    _is_sink_open: bool = field(default=False, repr=False, compare=False)
+    _checkpoint_idxs: list[int] = field(default_factory=list, repr=False)
+    _checkpoints: list = field(default_factory=list, repr=False)
+
+    @property
+    def events(self) -> list[Event]:
+        return self._items
+
+    def push(self, event: Event):
+        """With retain_events off, events only go to the sink; there's nothing to iterate or replay afterward"""
+        event = _INTERNED_EVENTS.setdefault(event, event)
+        if self.sink is not None:
+            if not self._is_sink_open:
+                self.sink.begin_game(self.seed)
+                self._is_sink_open = True
+            self.sink.write_event(event)
+        if self.retain_events:
+            super().push(event)
+
+    def close(self) -> None:
+        """Ends this game's record in the sink"""
+        if self._is_sink_open:
+            self.sink.end_game()
+            self._is_sink_open = False
+
+    @property
+    def needs_checkpoint(self) -> bool:
+        if not self.retain_events:
+            return False
+        last_idx = self._checkpoint_idxs[-1] if self._checkpoint_idxs else -1
+        return len(self) - 1 - last_idx >= self.checkpoint_every
+
+    def add_checkpoint(self, snapshot) -> None:
+        """Stores snapshot as the state after the most recently pushed event; snapshots should be immutable"""
+        if not self.retain_events:
+            return
+        event_idx = len(self) - 1
+        if self._checkpoint_idxs and self._checkpoint_idxs[-1] == event_idx:
+            self._checkpoints[-1] = snapshot
+        else:
+            self._checkpoint_idxs.append(event_idx)
+            self._checkpoints.append(snapshot)
+
+    def state_at(self, event_idx: int, restore: Callable[..., S], replay: Callable[[S, Event], None]) -> S:
+        """The state right after event event_idx: restore(snapshot) builds a fresh state from the nearest earlier
+        checkpoint & replay(state, event) applies each later event to it in place"""
+        if not 0 <= event_idx < len(self):
+            raise IndexError(f"There is no event {event_idx}")
+        pos = bisect_right(self._checkpoint_idxs, event_idx) - 1
+        if pos < 0:
+            raise ValueError(f"There is no checkpoint at or before event {event_idx}")
+        state = restore(self._checkpoints[pos])
+        for event in self._items[self._checkpoint_idxs[pos] + 1:event_idx + 1]:
+            replay(state, event)
+        return state
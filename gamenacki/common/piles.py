@@ -1,12 +1,17 @@
 """A module for common game collections such as Deck (an ABC), Hand, Discard. All subclass CardStack (a child of Stack).
-CardStack allows its implementers to use the attribute 'cards' instead of 'items'"""
+CardStack allows its implementers to use the attribute 'cards' instead of 'items'; IndexedCardStack also keeps
+a bitmask of its cards for O(1) membership & per-color queries"""
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 import random
 
 from gamenacki.common.stack import Stack
-from gamenacki.lostcitinacki.models.cards import Card
+from gamenacki.lostcitinacki.models.cards import Card, CARDS
+from gamenacki.lostcitinacki.models.constants import Color
+
+CARDS_BY_COLOR: dict[Color, tuple[Card, ...]] = {color: tuple(c for c in CARDS if c.color == color) for color in Color}
+COLOR_MASKS: dict[Color, int] = {color: sum(1 << c.idx for c in cards) for color, cards in CARDS_BY_COLOR.items()}
 
 
 @dataclass
@@ -24,29 +29,105 @@ class CardStack(Stack, ABC):
     def cards(self, value: list):
         if not isinstance(value, list):
             raise ValueError("cards must be a list")
-        for item in value:
-            self.push(item)  # Ensure each item is of type Card when setting cards
-        self._items = value
+        items = value.copy()
+        self.clear()
+        for item in items:
+            self.push(item)  # Pushed one by one so subclasses that track their cards stay in step
+
+
+@dataclass
+class IndexedCardStack(CardStack):
+    """A CardStack that keeps a bitmask of its cards by card idx, updated as cards are added & removed, so
+    'c in stack', color_cnt & cards_of_color are O(1) bit operations rather than scans of the cards.
+    Cards are interned & each is in at most one place, so a stack never holds a card twice.
+    Order is kept as in any Stack, so remove is still a list removal, but a single C-level pass"""
+    _mask: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._mask = 0
+        for c in self._items:
+            self._mask |= 1 << c.idx
+
+    def __contains__(self, c: Card) -> bool:
+        return self._mask >> c.idx & 1 == 1
+
+    @property
+    def mask(self) -> int:
+        """Bit c.idx is set for every card c in the stack; the same layout as bitboard.py's masks"""
+        return self._mask
+
+    def color_cnt(self, color: Color) -> int:
+        return (self._mask & COLOR_MASKS[color]).bit_count()
+
+    def cards_of_color(self, color: Color) -> list[Card]:
+        """The cards of color, in card order (handshakes, then ascending value)"""
+        chunk = self._mask & COLOR_MASKS[color]
+        return [c for c in CARDS_BY_COLOR[color] if chunk >> c.idx & 1]
+
+    def push(self, c: Card):
+        self._items.append(c)
+        self._mask |= 1 << c.idx
+
+    def insert(self, idx: int, c: Card):
+        self._items.insert(idx, c)
+        self._mask |= 1 << c.idx
+
+    def remove(self, c: Card):
+        if not self._mask >> c.idx & 1:
+            raise ValueError(f"{c} not found")
+        self._items.remove(c)
+        self._mask ^= 1 << c.idx
+
+    def pop(self) -> Card | None:
+        if not self._items:
+            return None
+        c = self._items.pop()
+        self._mask ^= 1 << c.idx
+        return c
+
+    def extend(self, cards: list[Card]) -> None:
+        self._items.extend(cards)
+        mask = self._mask
+        for c in cards:
+            mask |= 1 << c.idx
+        self._mask = mask
+
+    def pop_many(self, cnt: int) -> list[Card]:
+        cards = super().pop_many(cnt)
+        for c in cards:
+            self._mask ^= 1 << c.idx
+        return cards
+
+    def clear(self) -> None:
+        super().clear()
+        self._mask = 0
 
 
 @dataclass
 class BaseDeck(CardStack, ABC):
     _items: list[Card] = field(default_factory=list)
     start_shuffled: bool = True
+    rng: random.Random = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         self._items = self.build_deck()
         if self.start_shuffled:
-            random.shuffle(self._items)
+            self.shuffle(self.rng)
 
     @staticmethod
     @abstractmethod
     def build_deck() -> list[Card]:
         ...
 
+    def reset(self, rng: random.Random | None = None) -> None:
+        """Refills the deck with every card & shuffles it, reusing its list, for a new round"""
+        self._items[:] = self.build_deck()
+        self.shuffle(rng or self.rng)
+
 
 @dataclass
-class Hand(CardStack):
+class Hand(IndexedCardStack):
     ...
 
 
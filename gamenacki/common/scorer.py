@@ -1,21 +1,41 @@
 """BaseGameState creates an instance of Scorer as an attribute"""
 
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
 from enum import Enum, auto
+from functools import partial
+from typing import Callable
 
 
 @dataclass
 class Ledger:
+    """Keeps a running total, so values must be added through add_a_value rather than appended to ledger.
+    on_total_change(old_total, new_total) is called on every add; a Scorer sets it to keep its standing current"""
     ledger: list[int] = field(default_factory=list)
+    on_total_change: Callable[[int, int], None] = field(default=None, repr=False, compare=False)
+    _total: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._total = sum(self.ledger)
 
     def add_a_value(self, score: int) -> None:
         if not isinstance(score, int):
             raise ValueError(f"{score} must be an integer")
         self.ledger.append(score)
+        old_total, self._total = self._total, self._total + score
+        if self.on_total_change is not None:
+            self.on_total_change(old_total, self._total)
 
     @property
     def total(self) -> int:
-        return sum(self.ledger) if self.ledger else 0
+        return self._total
+
+    def clear(self) -> None:
+        """Empties the ledger for a new game"""
+        self.ledger.clear()
+        old_total, self._total = self._total, 0
+        if self.on_total_change is not None:
+            self.on_total_change(old_total, 0)
 
 
 class WinCondition(Enum):
@@ -27,30 +47,63 @@ class WinCondition(Enum):
 
 @dataclass
 class Scorer:
-    """Maintains ledgers, a win condition, the target score, who won ..."""
+    """Maintains ledgers, a win condition, the target score, who won ...
+    The standing, every player's (total, p_idx) in ascending order, is updated by bisection as each ledger changes,
+    so min/max points, their players & ranks don't rescan the ledgers"""
     ledgers: list[Ledger]
     win_condition: WinCondition
     target_score: int = None
+    _standing: list[tuple[int, int]] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for p_idx, pl in enumerate(self.ledgers):
+            pl.on_total_change = partial(self._update_standing, p_idx)
+        self._standing = sorted((pl.total, i) for i, pl in enumerate(self.ledgers))
+
+    def _update_standing(self, p_idx: int, old_total: int, new_total: int) -> None:
+        del self._standing[bisect_left(self._standing, (old_total, p_idx))]
+        insort(self._standing, (new_total, p_idx))
+
+    @property
+    def is_lowest_score_win(self) -> bool:
+        return self.win_condition in (WinCondition.LOWEST_SINGLE_SCORE_UPPER_BOUND_REACHED,
+                                      WinCondition.LOWEST_SCORE_W_TIES_UPPER_BOUND_REACHED)
 
     @property
     def p_idx_points(self) -> list[tuple[int, int]]:
         return [(i, pl.total) for i, pl in enumerate(self.ledgers)]
 
+    @property
+    def standings(self) -> list[tuple[int, int]]:
+        """(p_idx, points) from first place to last under the win condition; ties are ordered by p_idx"""
+        if self.is_lowest_score_win:
+            return [(i, total) for total, i in self._standing]
+        return sorted(((i, total) for total, i in self._standing), key=lambda t: -t[1])
+
     @property
     def max_points(self) -> int:
-        return max(t[1] for t in self.p_idx_points)
+        return self._standing[-1][0]
 
     @property
     def min_points(self) -> int:
-        return min(t[1] for t in self.p_idx_points)
+        return self._standing[0][0]
 
     @property
     def max_points_players(self) -> list[tuple[int, int]]:
-        return [e for e in self.p_idx_points if e[1] == self.max_points]
+        first = bisect_left(self._standing, (self.max_points, -1))
+        return [(i, total) for total, i in self._standing[first:]]
 
     @property
     def min_points_players(self) -> list[tuple[int, int]]:
-        return [e for e in self.p_idx_points if e[1] == self.min_points]
+        last = bisect_right(self._standing, (self.min_points, len(self.ledgers)))
+        return [(i, total) for total, i in self._standing[:last]]
+
+    def rank(self, p_idx: int) -> int:
+        """1 for first place under the win condition; tied players share a rank, as in 1, 1, 3"""
+        total = self.ledgers[p_idx].total
+        if self.is_lowest_score_win:
+            return 1 + bisect_left(self._standing, (total, -1))
+        return 1 + len(self._standing) - bisect_right(self._standing, (total, len(self.ledgers)))
 
     def get_winner(self, is_game_over: bool, *args) -> None | tuple[int, int] | list[tuple[int, int]]:
         if not is_game_over or (self.target_score and self.max_points < self.target_score):
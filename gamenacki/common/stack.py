@@ -7,7 +7,8 @@ T = TypeVar("T")  # Generic type for stack items
 
 @dataclass
 class Stack(Generic[T]):
-    """A general collection that accepts a list of items to: pop, push, shuffle, peek, remove, clear"""
+    """A general collection that accepts a list of items to: pop, push, insert, shuffle, peek, remove, clear, copy;
+    extend & pop_many are the bulk forms of push & pop"""
     _items: list[T] = field(default_factory=list)
 
     def __post_init__(self):
@@ -20,12 +21,15 @@ class Stack(Generic[T]):
     def __len__(self) -> int:
         return len(self._items) if self._items else 0
 
-    def shuffle(self):
-        random.shuffle(self._items)
+    def shuffle(self, rng: random.Random | None = None):
+        (rng or random).shuffle(self._items)
 
     def push(self, item: T):
         self._items.append(item)
 
+    def insert(self, idx: int, item: T):
+        self._items.insert(idx, item)
+
     def remove(self, item: T):
         if item not in self._items:
             raise ValueError(f"{item} not found")
@@ -34,6 +38,15 @@ class Stack(Generic[T]):
     def pop(self) -> T | None:
         return self._items.pop() if self._items else None
 
+    def extend(self, items: list[T]) -> None:
+        self._items.extend(items)
+
+    def pop_many(self, cnt: int) -> list[T]:
+        """Up to cnt items off the top, top first, as cnt pops would return them"""
+        popped = self._items[:-cnt - 1:-1] if cnt else []
+        del self._items[len(self._items) - len(popped):]
+        return popped
+
     def clear(self) -> None:
         self._items.clear()
 
@@ -42,3 +55,10 @@ class Stack(Generic[T]):
 
     def reveal(self) -> list[T]:
         return self._items
+
+    def copy(self):
+        """A shallow copy: a new Stack of the same type holding the same items"""
+        new_stack = object.__new__(type(self))
+        new_stack.__dict__.update(self.__dict__)
+        new_stack._items = self._items.copy()
+        return new_stack
@@ -0,0 +1,104 @@
+"""LostCities for an asyncio event loop.
+AsyncLostCities plays the same game as LostCities, but awaits each player's whole turn (AsyncPlayer.choose_move),
+every render & the pause between rounds, so one event loop can drive thousands of games at once while most of them
+wait on slow human or network players. Wrap synchronous players in OffloadedPlayer so CPU-bound bots run in an
+executor, & synchronous renderers in AsyncRendererAdapter.
+With metrics, phase times are wall-clock & so include time the loop spent on other games while this one waited."""
+
+import asyncio
+from dataclasses import dataclass, field
+
+from gamenacki.common.base_engine import AsyncBaseEngine
+from gamenacki.common.base_renderer import AsyncRenderer
+from gamenacki.common.log import Log, Event, EventObserver
+
+from gamenacki.lostcitinacki.engine import EngineEventsMixin
+from gamenacki.lostcitinacki.metrics import EngineMetrics, Phase
+from gamenacki.lostcitinacki.models.constants import Action
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.players import AsyncPlayer
+
+
+@dataclass
+class AsyncLostCities(EngineEventsMixin, AsyncBaseEngine):
+    """seed is recorded in the log & seeds the game's rng when no GameState is given"""
+    players: list[AsyncPlayer]
+    renderer: AsyncRenderer
+    gs: GameState = None
+    log: Log = field(default_factory=Log)
+    max_rounds: int = 3
+    round_end_delay: float = 2
+    seed: int = None
+    metrics: EngineMetrics = field(default=None, repr=False)
+    observers: list[EventObserver] = field(default_factory=list, repr=False)
+
+    async def play(self) -> None:
+        lap = self._start_metrics()
+        self._log(Event(Action.BEGIN_ROUND), checkpoint=True)
+        lap(Phase.LOG)
+        while not self.gs.is_game_over:
+            await self.renderer.render(self.gs, self.players)
+            lap(Phase.RENDER)
+            turn_idx = self.gs.dealer.player_turn_idx
+            try:
+                move = await self.players[turn_idx].choose_move(self.gs)
+                lap(Phase.DECISION)
+                if not self.gs.is_legal_move(turn_idx, move):
+                    raise ValueError(f"{move} is not a legal move")
+                self.gs.play_card_to(turn_idx, move.card, move.play_to)
+                lap(Phase.PLAY_CARD)
+                self._log(Event(Action.PLAY_CARD, turn_idx, move.card.idx, dest=move.play_to))
+                lap(Phase.LOG)
+                drawn_card = self.gs.draw_from(turn_idx, move.draw_from)
+                lap(Phase.DRAW)
+                self._log(Event(Action.PICKUP_CARD, turn_idx, drawn_card.idx, source=move.draw_from))
+                lap(Phase.LOG)
+
+            except Exception as ex:
+                lap(Phase.ERROR)
+                self._count_error()
+                await self.renderer.render_error(ex)
+                lap(Phase.RENDER)
+
+            if self.gs.is_round_over:
+                self.gs.assign_points()
+                lap(Phase.SCORING)
+                await self.renderer.render(self.gs, self.players)
+                lap(Phase.RENDER)
+                self._log(Event(Action.END_ROUND))
+                lap(Phase.LOG)
+                if self.round_end_delay:
+                    await asyncio.sleep(self.round_end_delay)
+                    lap(Phase.DELAY)
+                if not self.gs.is_game_over:
+                    self.gs.create_new_round()
+                    lap(Phase.DEAL)
+                    self._log(Event(Action.BEGIN_ROUND), checkpoint=True)
+                    lap(Phase.LOG)
+
+        await self.renderer.render(self.gs, self.players)
+        lap(Phase.RENDER)
+        self._log(Event(Action.END_GAME))
+        self.log.close()
+        lap(Phase.LOG)
+        await self.renderer.render_log(self.log)
+        lap(Phase.RENDER)
+
+
+async def play_games(games: list[AsyncLostCities], max_concurrency: int | None = None) -> list[AsyncLostCities]:
+    """Plays every game on the running loop, at most max_concurrency at a time, & returns them once all are over.
+    A game that raises doesn't stop the others; its exception is re-raised after they all finish"""
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def play_one(game: AsyncLostCities) -> None:
+        if semaphore is None:
+            await game.play()
+            return
+        async with semaphore:
+            await game.play()
+
+    outcomes = await asyncio.gather(*(play_one(game) for game in games), return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    return games
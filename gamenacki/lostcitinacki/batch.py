@@ -0,0 +1,291 @@
+"""A NumPy batch engine: n_games two-player games held as arrays & advanced one turn at a time in lockstep.
+Cards are referred to by their idx in cards.CARDS. Per game there are hand & board masks per player, the deck &
+discard as card-idx stacks with their lengths, the color maxima shared by both boards (as GameState._color_maxes) &
+running value sums, handshake counts & card counts per player & color (as Expedition keeps).
+step() applies one turn to every unfinished game: it mirrors GameState.play_card_to & draw_from, then checks
+is_round_over, scores finished rounds like Expedition.points & deals the next round in place.
+
+Moves come from policies, one per seat, that choose for many games at once from array masks; BotPolicy is
+BotPlayer's policy as array operations. Games are dealt from a NumPy Generator, so they are not the games
+random.Random would deal for the same seed. to_bit_state exports one game, e.g. to check it against BitState.
+NumPy is an optional dependency, needed only by this module."""
+
+from dataclasses import dataclass, field
+from typing import Protocol, Sequence
+
+try:
+    import numpy as np
+except ImportError as ex:
+    raise ImportError("The batch engine needs NumPy: pip install numpy") from ex
+
+from gamenacki.lostcitinacki.models.bitboard import BitState, to_mask
+from gamenacki.lostcitinacki.models.cards import CARDS, CARDS_PER_COLOR, HANDSHAKES_PER_COLOR
+from gamenacki.lostcitinacki.models.constants import Color
+
+CARD_CNT = len(CARDS)
+COLOR_CNT = len(Color)
+PLAYER_CNT = 2
+HAND_SIZE = 8
+CARD_VALUES = np.array([c.value for c in CARDS], dtype=np.int16)
+CARD_COLORS = np.array([c.idx // CARDS_PER_COLOR for c in CARDS], dtype=np.int16)
+IS_HANDSHAKE = CARD_VALUES == 0
+EXPEDITION, DECK, DISCARD = 0, 0, 1  # play_to is EXPEDITION or DISCARD, draw_from is DECK or DISCARD
+
+
+class BatchPolicy(Protocol):
+    def choose(self, games: "BatchGames", rows: np.ndarray, seat: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """For the games at rows, where it's seat's turn: each game's card idx, play_to code & draw_from code"""
+        ...
+
+
+@dataclass
+class BatchGames:
+    n_games: int
+    max_rounds: int = 3
+    seed: int | None = None
+    rng: np.random.Generator = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        k = self.n_games
+        self.rng = np.random.default_rng(self.seed)
+        self.hands = np.zeros((k, PLAYER_CNT, CARD_CNT), dtype=bool)
+        self.boards = np.zeros((k, PLAYER_CNT, CARD_CNT), dtype=bool)
+        self.deck = np.zeros((k, CARD_CNT), dtype=np.int16)
+        self.deck_len = np.zeros(k, dtype=np.int16)
+        self.discard = np.zeros((k, CARD_CNT), dtype=np.int16)
+        self.discard_len = np.zeros(k, dtype=np.int16)
+        self.color_maxes = np.zeros((k, COLOR_CNT), dtype=np.int16)
+        self.value_sums = np.zeros((k, PLAYER_CNT, COLOR_CNT), dtype=np.int16)
+        self.handshake_cnts = np.zeros((k, PLAYER_CNT, COLOR_CNT), dtype=np.int16)
+        self.card_cnts = np.zeros((k, PLAYER_CNT, COLOR_CNT), dtype=np.int16)
+        self.scores = np.zeros((k, PLAYER_CNT), dtype=np.int32)
+        self.dealer_idx = self.rng.integers(0, PLAYER_CNT, k).astype(np.int8)
+        self.turn = np.zeros(k, dtype=np.int8)
+        self.round_number = np.ones(k, dtype=np.int16)
+        self.turn_cnt = np.zeros(k, dtype=np.int32)
+        self.is_finished = np.zeros(k, dtype=bool)
+        self._deal(np.arange(k))
+
+    @classmethod
+    def from_bit_states(cls, states: Sequence[BitState], copies: Sequence[int], seed: int | None = None) -> "BatchGames":
+        """copies[i] games continuing states[i], in consecutive rows, each with the deck reshuffled as its order is
+        hidden; e.g. for rollouts. The states must be two-player, share max_rounds & be mid-round"""
+        games = cls(sum(copies), states[0].max_rounds, seed)
+        bits = np.arange(CARD_CNT, dtype=np.int64)
+        start = 0
+        for bs, cnt in zip(states, copies):
+            if bs.player_cnt != PLAYER_CNT or bs.max_rounds != games.max_rounds or bs.is_round_over:
+                raise ValueError("States must be two-player, share max_rounds & have a round in progress")
+            rows = slice(start, start + cnt)
+            start += cnt
+            games.hands[rows] = [(np.int64(mask) >> bits & 1).astype(bool) for mask in bs.hands]
+            boards = np.array([(np.int64(mask) >> bits & 1).astype(bool) for mask in bs.boards])
+            games.boards[rows] = boards
+            deck = np.array(bs.deck, dtype=np.int16)
+            games.deck[rows, :len(deck)] = deck[np.argsort(games.rng.random((cnt, len(deck))), axis=1)]
+            games.deck_len[rows] = len(deck)
+            games.discard[rows, :len(bs.discard)] = bs.discard
+            games.discard_len[rows] = len(bs.discard)
+            by_color = boards.reshape(PLAYER_CNT, COLOR_CNT, CARDS_PER_COLOR)
+            values = CARD_VALUES.reshape(COLOR_CNT, CARDS_PER_COLOR)
+            games.value_sums[rows] = (by_color * values).sum(axis=2)
+            games.handshake_cnts[rows] = by_color[:, :, :HANDSHAKES_PER_COLOR].sum(axis=2)
+            games.card_cnts[rows] = by_color.sum(axis=2)
+            games.color_maxes[rows] = (by_color * values).max(axis=(0, 2))
+            games.scores[rows] = [sum(ledger) for ledger in bs.ledgers]
+            games.dealer_idx[rows], games.turn[rows] = bs.dealer_idx, bs.player_turn_idx
+            games.round_number[rows] = bs.round_number
+        return games
+
+    def _deal(self, rows: np.ndarray) -> None:
+        """Clears & deals a new round for rows; the player left of the dealer is dealt first & plays first"""
+        n = len(rows)
+        self.deck[rows] = np.argsort(self.rng.random((n, CARD_CNT)), axis=1)
+        self.hands[rows] = False
+        self.boards[rows] = False
+        self.discard_len[rows] = 0
+        self.color_maxes[rows] = 0
+        self.value_sums[rows] = 0
+        self.handshake_cnts[rows] = 0
+        self.card_cnts[rows] = 0
+        first = (self.dealer_idx[rows] + 1) % PLAYER_CNT
+        self.turn[rows] = first
+        top = CARD_CNT - 1 - np.arange(PLAYER_CNT * HAND_SIZE)  # deck positions in the order they're dealt
+        for i, pos in enumerate(top):
+            seat = (first + i) % PLAYER_CNT
+            self.hands[rows, seat, self.deck[rows, pos]] = True
+        self.deck_len[rows] = CARD_CNT - PLAYER_CNT * HAND_SIZE
+
+    @property
+    def active_rows(self) -> np.ndarray:
+        return np.flatnonzero(~self.is_finished)
+
+    def playable_mask(self, rows: np.ndarray) -> np.ndarray:
+        """(len(rows), CARD_CNT): the cards that may be played to an expedition, as GameState.is_card_playable"""
+        color_maxes = self.color_maxes[rows][:, CARD_COLORS]
+        return (CARD_VALUES > color_maxes) | (color_maxes == 0)
+
+    def legal_move_mask(self, rows: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """(len(rows), CARD_CNT, 2, 2) over card, play_to & draw_from codes for the player to move, as
+        GameState.is_legal_move; every handshake is included, unlike legal_moves. Written into out if given"""
+        hands = self.hands[rows, self.turn[rows]]
+        to_expedition = hands & self.playable_mask(rows)
+        mask = np.zeros((len(rows), CARD_CNT, 2, 2), dtype=bool) if out is None else out
+        mask[:, :, DISCARD, DISCARD] = False
+        mask[:, :, EXPEDITION, DECK] = to_expedition
+        mask[:, :, EXPEDITION, DISCARD] = to_expedition & (self.discard_len[rows] > 0)[:, None]
+        mask[:, :, DISCARD, DECK] = hands
+        return mask
+
+    def board_points(self, rows: np.ndarray | slice = slice(None)) -> np.ndarray:
+        """(games, PLAYER_CNT): each board's points, as ExpeditionBoard.points"""
+        card_cnts = self.card_cnts[rows]
+        points = (self.value_sums[rows] - 20) * (1 + self.handshake_cnts[rows]) + np.where(card_cnts >= 8, 20, 0)
+        return np.where(card_cnts > 0, points, 0).sum(axis=2)
+
+    def step(self, policies: list[BatchPolicy]) -> int:
+        """Plays one turn in every unfinished game & returns how many games moved"""
+        rows = self.active_rows
+        if not len(rows):
+            return 0
+        cards = np.empty(len(rows), dtype=np.int16)
+        play_to = np.empty(len(rows), dtype=np.int8)
+        draw_from = np.empty(len(rows), dtype=np.int8)
+        turn = self.turn[rows]
+        for seat, policy in enumerate(policies):
+            seated = turn == seat
+            if seated.any():
+                cards[seated], play_to[seated], draw_from[seated] = policy.choose(self, rows[seated], seat)
+        self._check_legal(rows, turn, cards, play_to, draw_from)
+        self._play(rows, turn, cards, play_to)
+        self._draw(rows, turn, draw_from)
+        self.turn[rows] = 1 - turn
+        self.turn_cnt[rows] += 1
+        self._end_rounds(rows)
+        return len(rows)
+
+    def run(self, policies: list[BatchPolicy]) -> "BatchGames":
+        while self.step(policies):
+            pass
+        return self
+
+    def _check_legal(self, rows, turn, cards, play_to, draw_from) -> None:
+        legal = self.hands[rows, turn, cards]
+        legal &= (play_to == DISCARD) | self.playable_mask(rows)[np.arange(len(rows)), cards]
+        legal &= (draw_from == DECK) | ((play_to == EXPEDITION) & (self.discard_len[rows] > 0))
+        if not legal.all():
+            bad = np.flatnonzero(~legal)[0]
+            raise ValueError(f"Game {rows[bad]}: {CARDS[cards[bad]]} with play_to {play_to[bad]} & draw_from "
+                             f"{draw_from[bad]} is not a legal move")
+
+    def _play(self, rows, turn, cards, play_to) -> None:
+        self.hands[rows, turn, cards] = False
+        exp = play_to == EXPEDITION
+        e_rows, e_turn, e_cards = rows[exp], turn[exp], cards[exp]
+        colors = CARD_COLORS[e_cards]
+        self.boards[e_rows, e_turn, e_cards] = True
+        self.value_sums[e_rows, e_turn, colors] += CARD_VALUES[e_cards]
+        self.handshake_cnts[e_rows, e_turn, colors] += IS_HANDSHAKE[e_cards]
+        self.card_cnts[e_rows, e_turn, colors] += 1
+        self.color_maxes[e_rows, colors] = np.maximum(self.color_maxes[e_rows, colors], CARD_VALUES[e_cards])
+        d_rows = rows[~exp]
+        self.discard[d_rows, self.discard_len[d_rows]] = cards[~exp]
+        self.discard_len[d_rows] += 1
+
+    def _draw(self, rows, turn, draw_from) -> None:
+        from_discard = draw_from == DISCARD
+        d_rows = rows[from_discard]
+        self.discard_len[d_rows] -= 1
+        drawn = np.empty(len(rows), dtype=np.int16)
+        drawn[from_discard] = self.discard[d_rows, self.discard_len[d_rows]]
+        k_rows = rows[~from_discard]
+        self.deck_len[k_rows] -= 1
+        drawn[~from_discard] = self.deck[k_rows, self.deck_len[k_rows]]
+        self.hands[rows, turn, drawn] = True
+
+    def _end_rounds(self, rows) -> None:
+        """Scores every round that's over, as is_round_over & assign_points, then deals the next or ends the game"""
+        over = rows[(self.deck_len[rows] == 0) | (self.color_maxes[rows] == 10).all(axis=1)]
+        if not len(over):
+            return
+        self.scores[over] += self.board_points(over)
+        is_last_round = self.round_number[over] >= self.max_rounds
+        self.is_finished[over[is_last_round]] = True
+        next_round = over[~is_last_round]
+        if len(next_round):
+            self.dealer_idx[next_round] = (self.dealer_idx[next_round] + 1) % PLAYER_CNT
+            self.round_number[next_round] += 1
+            self._deal(next_round)
+
+    @property
+    def winners(self) -> np.ndarray:
+        """(n_games, PLAYER_CNT) bool: the highest total(s) of each game, ties included"""
+        return self.scores == self.scores.max(axis=1, keepdims=True)
+
+    def to_bit_state(self, game_idx: int) -> BitState:
+        """Game game_idx as a BitState with empty ledgers; its scores so far are in scores"""
+        return BitState(hands=[to_mask(CARDS[i] for i in np.flatnonzero(h)) for h in self.hands[game_idx]],
+                        boards=[to_mask(CARDS[i] for i in np.flatnonzero(b)) for b in self.boards[game_idx]],
+                        deck=self.deck[game_idx, :self.deck_len[game_idx]].tolist(),
+                        discard=self.discard[game_idx, :self.discard_len[game_idx]].tolist(),
+                        player_turn_idx=int(self.turn[game_idx]), dealer_idx=int(self.dealer_idx[game_idx]),
+                        round_number=int(self.round_number[game_idx]), max_rounds=self.max_rounds,
+                        ledgers=((), ()))
+
+
+def canonical_hands(hands: np.ndarray) -> np.ndarray:
+    """hands (..., CARD_CNT) with all but the lowest handshake of each color cleared, as the handshakes of a color
+    are interchangeable"""
+    by_color = hands.reshape(*hands.shape[:-1], COLOR_CNT, CARDS_PER_COLOR).copy()
+    held_lower = np.zeros(by_color.shape[:-1], dtype=bool)
+    for i in range(HANDSHAKES_PER_COLOR):
+        by_color[..., i] &= ~held_lower
+        held_lower |= by_color[..., i]
+    return by_color.reshape(hands.shape)
+
+
+def _choose_uniform(rng: np.random.Generator, candidates: np.ndarray) -> np.ndarray:
+    """One column index per row, uniformly among the row's True entries; every row needs at least one"""
+    return np.where(candidates, rng.random(candidates.shape, dtype=np.float32), -1.0).argmax(axis=1)
+
+
+@dataclass
+class BotPolicy:
+    """BotPlayer.choose_move for many games at once: a random playable card in hand (every card equally likely, as
+    BotPlayer weighs a color's handshakes by how many it holds) to its expedition, else a random card to the
+    discard; then the discard's top card, 8 times in 10, when it was playable after the play, else the deck"""
+    rng: np.random.Generator = field(default_factory=np.random.default_rng)
+
+    def choose(self, games: BatchGames, rows: np.ndarray, seat: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        hands = games.hands[rows, seat]
+        playable = hands & games.playable_mask(rows)
+        has_play = playable.any(axis=1)
+        cards = _choose_uniform(self.rng, np.where(has_play[:, None], playable, hands)).astype(np.int16)
+        play_to = np.where(has_play, EXPEDITION, DISCARD).astype(np.int8)
+
+        discard_len = games.discard_len[rows]
+        has_top = has_play & (discard_len > 0)
+        top = games.discard[rows, np.maximum(discard_len - 1, 0)]
+        top_color = CARD_COLORS[top]
+        color_max = games.color_maxes[rows, top_color]
+        played_same_color = CARD_COLORS[cards] == top_color
+        color_max = np.where(played_same_color, np.maximum(color_max, CARD_VALUES[cards]), color_max)
+        top_playable = has_top & ((CARD_VALUES[top] > color_max) | (color_max == 0))
+        from_discard = top_playable & (self.rng.random(len(rows)) < 0.8)
+        return cards, play_to, np.where(from_discard, DISCARD, DECK).astype(np.int8)
+
+
+@dataclass
+class RandomPolicy:
+    """A uniformly random legal move, a color's handshakes counted once, as ISMCTS rollouts choose"""
+    rng: np.random.Generator = field(default_factory=np.random.default_rng)
+
+    def choose(self, games: BatchGames, rows: np.ndarray, seat: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        hands = canonical_hands(games.hands[rows, seat])
+        to_expedition = hands & games.playable_mask(rows)
+        legal = np.zeros((len(rows), CARD_CNT, 2, 2), dtype=bool)
+        legal[:, :, EXPEDITION, DECK] = to_expedition
+        legal[:, :, EXPEDITION, DISCARD] = to_expedition & (games.discard_len[rows] > 0)[:, None]
+        legal[:, :, DISCARD, DECK] = hands
+        move_idxs = _choose_uniform(self.rng, legal.reshape(len(rows), -1))
+        return (move_idxs // 4).astype(np.int16), (move_idxs // 2 % 2).astype(np.int8), (move_idxs % 2).astype(np.int8)
@@ -0,0 +1,150 @@
+"""What one player can know about the cards they can't see, kept up to date event by event.
+A BeliefTracker follows a game for its player (p_idx) as an EventObserver of the engine: at each BEGIN_ROUND it
+reads p_idx's dealt hand & the deck size, after that it only uses what the events show every player, i.e. cards
+played & cards drawn from the discard. The card idx logged when another player draws from the deck is never read.
+
+State is a few int bitmasks by card idx (as in bitboard.py): unseen, the cards in the deck or another hand, & per
+player the cards known to be in their hand, p_idx's whole hand & the others' discard pickups they still hold.
+Every unseen card not known to be in a hand is equally likely to be any of the remaining deck's cards or any of the
+other hands' unknown cards, so the next n deck draws are a uniformly random n of the unknown cards & counts of
+a set of cards among them are hypergeometric. Updates & queries are O(1) bit operations & math.comb calls, cheap
+enough for every turn of a search; play & draw update a copy along a searched line as the events would."""
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from gamenacki.common.log import Event, EventObserver
+from gamenacki.lostcitinacki.models.bitboard import ALL_CARDS_MASK, to_cards
+from gamenacki.lostcitinacki.models.cards import Card
+from gamenacki.lostcitinacki.models.constants import Action, DrawFromStack
+from gamenacki.lostcitinacki.models.game_state import GameState
+
+
+@lru_cache(maxsize=4096)
+def hypergeometric_pmf(population: int, successes: int, draws: int, k: int) -> float:
+    """P(exactly k of draws cards drawn without replacement from population are among its successes)"""
+    if draws > population or not 0 <= k <= min(successes, draws) or draws - k > population - successes:
+        return 0.0
+    return math.comb(successes, k) * math.comb(population - successes, draws - k) / math.comb(population, draws)
+
+
+@dataclass
+class BeliefTracker(EventObserver):
+    p_idx: int
+    player_cnt: int = 2
+    unseen: int = 0
+    known_hands: list[int] = field(default_factory=list)
+    hand_sizes: list[int] = field(default_factory=list)
+    deck_cnt: int = 0
+
+    def __post_init__(self):
+        self.known_hands = self.known_hands or [0] * self.player_cnt
+        self.hand_sizes = self.hand_sizes or [0] * self.player_cnt
+
+    def observe(self, event: Event, gs: GameState) -> None:
+        if event.action == Action.BEGIN_ROUND:
+            hand = gs.piles.hands[self.p_idx]
+            self.begin_round(hand.mask, len(gs.piles.deck), len(hand))
+        elif event.action == Action.PLAY_CARD:
+            self.play(event.player_idx, event.card_idx)
+        elif event.action == Action.PICKUP_CARD:
+            if event.source == DrawFromStack.DISCARD:
+                self.draw_discard(event.player_idx, event.card_idx)
+            else:
+                self.draw_deck(event.player_idx, event.card_idx if event.player_idx == self.p_idx else None)
+
+    def begin_round(self, hand_mask: int, deck_cnt: int, hand_size: int) -> None:
+        """A new deal: every card is unseen but p_idx's hand"""
+        self.unseen = ALL_CARDS_MASK & ~hand_mask
+        self.known_hands = [0] * self.player_cnt
+        self.known_hands[self.p_idx] = hand_mask
+        self.hand_sizes = [hand_size] * self.player_cnt
+        self.deck_cnt = deck_cnt
+
+    def play(self, p_idx: int, card_idx: int) -> None:
+        """p_idx played card_idx face up, to an expedition or the discard"""
+        bit = 1 << card_idx
+        self.known_hands[p_idx] &= ~bit
+        self.unseen &= ~bit
+        self.hand_sizes[p_idx] -= 1
+
+    def draw_discard(self, p_idx: int, card_idx: int) -> None:
+        self.known_hands[p_idx] |= 1 << card_idx
+        self.hand_sizes[p_idx] += 1
+
+    def draw_deck(self, p_idx: int, card_idx: int | None = None) -> None:
+        """card_idx is the card drawn, which only p_idx sees"""
+        self.deck_cnt -= 1
+        self.hand_sizes[p_idx] += 1
+        if p_idx == self.p_idx:
+            bit = 1 << card_idx
+            self.unseen &= ~bit
+            self.known_hands[p_idx] |= bit
+
+    def copy(self) -> "BeliefTracker":
+        return BeliefTracker(self.p_idx, self.player_cnt, self.unseen, self.known_hands.copy(),
+                             self.hand_sizes.copy(), self.deck_cnt)
+
+    @property
+    def unseen_cards(self) -> list[Card]:
+        return to_cards(self.unseen)
+
+    @property
+    def unseen_cnt(self) -> int:
+        return self.unseen.bit_count()
+
+    def known_cards(self, p_idx: int) -> list[Card]:
+        """The cards known to be in p_idx's hand: all of p_idx's own, the discard pickups of anyone else"""
+        return to_cards(self.known_hands[p_idx])
+
+    @property
+    def unknown(self) -> int:
+        """The unseen cards that aren't known to be in a hand, as a mask; the deck is drawn from these"""
+        other_known = 0
+        for p_idx, known in enumerate(self.known_hands):
+            if p_idx != self.p_idx:
+                other_known |= known
+        return self.unseen & ~other_known
+
+    def draw_pmf(self, cards_mask: int, draws: int = 1) -> list[float]:
+        """P(exactly k of cards_mask's cards are among the next draws deck cards), for k = 0..draws"""
+        unknown = self.unknown
+        successes = (cards_mask & unknown).bit_count()
+        population = unknown.bit_count()
+        draws = min(draws, self.deck_cnt)
+        return [hypergeometric_pmf(population, successes, draws, k) for k in range(draws + 1)]
+
+    def draw_probability(self, cards_mask: int, draws: int = 1) -> float:
+        """P(at least one of cards_mask's cards is among the next draws deck cards)"""
+        unknown = self.unknown
+        draws = min(draws, self.deck_cnt)
+        return 1.0 - hypergeometric_pmf(unknown.bit_count(), (cards_mask & unknown).bit_count(), draws, 0)
+
+    def card_draw_probability(self, c: Card, draws: int = 1) -> float:
+        return self.draw_probability(1 << c.idx, draws)
+
+    def in_deck_probability(self, c: Card) -> float:
+        """P(c is still in the deck)"""
+        unknown = self.unknown
+        if not unknown >> c.idx & 1:
+            return 0.0
+        return self.deck_cnt / unknown.bit_count()
+
+    def in_hand_probability(self, c: Card, p_idx: int) -> float:
+        """P(c is in p_idx's hand); for a two-player game, the chance the opponent holds it"""
+        if self.known_hands[p_idx] >> c.idx & 1:
+            return 1.0
+        unknown = self.unknown
+        if p_idx == self.p_idx or not unknown >> c.idx & 1:
+            return 0.0
+        unknown_held = self.hand_sizes[p_idx] - self.known_hands[p_idx].bit_count()
+        return unknown_held / unknown.bit_count()
+
+
+def track_beliefs(game) -> list[BeliefTracker]:
+    """A BeliefTracker for each of game's players, registered as observers of the engine from its next event on;
+    register before play() so the first BEGIN_ROUND is seen"""
+    trackers = [BeliefTracker(p_idx, game.player_cnt) for p_idx in range(game.player_cnt)]
+    game.observers.extend(trackers)
+    return trackers
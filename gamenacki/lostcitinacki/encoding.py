@@ -0,0 +1,246 @@
+"""Fixed-shape NumPy encodings of positions for value & policy models, as seen by one player (the observer).
+A position's features are a flat vector of FeatureEncoder.feature_size values, in blocks of CARD_CNT planes indexed
+by card idx unless noted:
+    hand          the observer's hand
+    boards        each player's expedition board, the observer's first, then the following seats in turn order
+    discard       every card in the discard pile
+    discard_top   the top card of the discard pile, the only one that can be drawn
+    deck_cnt      1 value: the cards left in the deck, as a fraction of CARD_CNT
+    round         1 value: round_number / max_rounds
+    is_turn       1 value: 1 when it's the observer's turn
+Its legal-move mask has MOVE_CNT entries, one per (card idx, play_to, draw_from) as move_index numbers them, which
+is batch.BatchGames.legal_move_mask flattened. It's the observer's legal moves, so it's empty once the round is over.
+
+Every encode method writes into buffers from feature_buffer & mask_buffer when they're passed, so a pipeline can
+fill one preallocated batch in place; otherwise it allocates them. encode & encode_batch read GameStates;
+encode_games reads a BatchGames directly, for the player to move in each game.
+self_play_batches streams training batches from batch-engine games played across a process pool."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Sequence
+
+import numpy as np
+
+from gamenacki.lostcitinacki.batch import (BatchGames, BatchPolicy, BotPolicy, CARD_CNT, DECK, DISCARD,
+                                           EXPEDITION, PLAYER_CNT)
+from gamenacki.lostcitinacki.models.constants import DrawFromStack, PlayToStack
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.moves import Move, MOVES
+
+MOVE_CNT = CARD_CNT * 2 * 2
+PLAY_TO_CODES = {PlayToStack.EXPEDITION: EXPEDITION, PlayToStack.DISCARD: DISCARD}
+DRAW_FROM_CODES = {DrawFromStack.DECK: DECK, DrawFromStack.DISCARD: DISCARD}
+
+
+def move_index(move: Move) -> int:
+    return move.card.idx * 4 + PLAY_TO_CODES[move.play_to] * 2 + DRAW_FROM_CODES[move.draw_from]
+
+
+# MOVE_INDEX_MOVES[move_index(m)] is m; the index of a discard drawing from the discard is never legal & maps to None
+MOVE_INDEX_MOVES: list[Move | None] = [None] * MOVE_CNT
+for _m in MOVES.values():
+    if _m.play_to == PlayToStack.EXPEDITION or _m.draw_from == DrawFromStack.DECK:
+        MOVE_INDEX_MOVES[move_index(_m)] = _m
+del _m
+
+
+@dataclass
+class FeatureEncoder:
+    player_cnt: int = PLAYER_CNT
+    dtype: type = np.float32
+    hand: slice = field(init=False, repr=False)
+    boards: slice = field(init=False, repr=False)
+    discard: slice = field(init=False, repr=False)
+    discard_top: slice = field(init=False, repr=False)
+    deck_cnt: int = field(init=False, repr=False)
+    round: int = field(init=False, repr=False)
+    is_turn: int = field(init=False, repr=False)
+    feature_size: int = field(init=False)
+
+    def __post_init__(self):
+        board_end = CARD_CNT * (1 + self.player_cnt)
+        self.hand, self.boards = slice(0, CARD_CNT), slice(CARD_CNT, board_end)
+        self.discard = slice(board_end, board_end + CARD_CNT)
+        self.discard_top = slice(board_end + CARD_CNT, board_end + 2 * CARD_CNT)
+        self.deck_cnt, self.round, self.is_turn = range(board_end + 2 * CARD_CNT, board_end + 2 * CARD_CNT + 3)
+        self.feature_size = self.is_turn + 1
+
+    def board(self, seat_offset: int) -> slice:
+        """The board block of the player seat_offset seats after the observer"""
+        start = self.boards.start + seat_offset * CARD_CNT
+        return slice(start, start + CARD_CNT)
+
+    def feature_buffer(self, n: int) -> np.ndarray:
+        return np.zeros((n, self.feature_size), dtype=self.dtype)
+
+    @staticmethod
+    def mask_buffer(n: int) -> np.ndarray:
+        return np.zeros((n, MOVE_CNT), dtype=bool)
+
+    def encode(self, gs: GameState, p_idx: int, features: np.ndarray | None = None,
+               mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """p_idx's view of gs, as a feature row & a legal-move mask row"""
+        if gs.player_cnt != self.player_cnt:
+            raise ValueError(f"This encoder is for {self.player_cnt} players, not {gs.player_cnt}")
+        features = np.zeros(self.feature_size, dtype=self.dtype) if features is None else features
+        mask = np.zeros(MOVE_CNT, dtype=bool) if mask is None else mask
+        features.fill(0)
+        mask.fill(False)
+        piles, hand_start = gs.piles, self.hand.start
+        for c in piles.hands[p_idx]:
+            features[hand_start + c.idx] = 1
+        for seat_offset in range(self.player_cnt):
+            start = self.board(seat_offset).start
+            for exp in piles.exp_boards[(p_idx + seat_offset) % self.player_cnt]:
+                for c in exp:
+                    features[start + c.idx] = 1
+        for c in piles.discard:
+            features[self.discard.start + c.idx] = 1
+        top_card = piles.discard.peek()
+        if top_card is not None:
+            features[self.discard_top.start + top_card.idx] = 1
+        features[self.deck_cnt] = len(piles.deck) / CARD_CNT
+        features[self.round] = gs.dealer.current_round_number / gs.max_rounds
+        features[self.is_turn] = gs.dealer.player_turn_idx == p_idx
+        if not gs.is_round_over:
+            playable, can_draw_discard = gs.board_playable_cards, top_card is not None
+            for c in piles.hands[p_idx]:
+                i = c.idx * 4
+                if c in playable:
+                    mask[i + EXPEDITION * 2 + DECK] = True
+                    mask[i + EXPEDITION * 2 + DISCARD] = can_draw_discard
+                mask[i + DISCARD * 2 + DECK] = True
+        return features, mask
+
+    def encode_batch(self, states: Sequence[GameState], p_idxs: Sequence[int], features: np.ndarray | None = None,
+                     masks: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Row i is p_idxs[i]'s view of states[i]; buffers may have spare rows, only the first len(states) are
+        written & returned"""
+        n = len(states)
+        features = self.feature_buffer(n) if features is None else features[:n]
+        masks = self.mask_buffer(n) if masks is None else masks[:n]
+        for i, (gs, p_idx) in enumerate(zip(states, p_idxs)):
+            self.encode(gs, p_idx, features[i], masks[i])
+        return features, masks
+
+    def encode_games(self, games: BatchGames, rows: np.ndarray, features: np.ndarray | None = None,
+                     masks: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """The view of the player to move in each of games' rows, vectorized across games"""
+        if self.player_cnt != PLAYER_CNT:
+            raise ValueError(f"BatchGames are {PLAYER_CNT}-player games")
+        n = len(rows)
+        features = self.feature_buffer(n) if features is None else features[:n]
+        masks = self.mask_buffer(n) if masks is None else masks[:n]
+        turn = games.turn[rows]
+        features[:, self.hand] = games.hands[rows, turn]
+        features[:, self.board(0)] = games.boards[rows, turn]
+        features[:, self.board(1)] = games.boards[rows, 1 - turn]
+        discard_len = games.discard_len[rows]
+        features[:, self.discard] = 0
+        in_pile, pile_pos = np.nonzero(np.arange(CARD_CNT) < discard_len[:, None])
+        features[in_pile, self.discard.start + games.discard[rows[in_pile], pile_pos]] = 1
+        features[:, self.discard_top] = 0
+        has_top = np.flatnonzero(discard_len > 0)
+        top = games.discard[rows[has_top], discard_len[has_top] - 1]
+        features[has_top, self.discard_top.start + top] = 1
+        features[:, self.deck_cnt] = games.deck_len[rows] / CARD_CNT
+        features[:, self.round] = games.round_number[rows] / games.max_rounds
+        features[:, self.is_turn] = 1
+        games.legal_move_mask(rows, out=masks.reshape(n, CARD_CNT, 2, 2))
+        return features, masks
+
+
+@dataclass(frozen=True, slots=True)
+class SelfPlayBatch:
+    """Positions with the move played from each (its move_index) & how the game went for the player to move:
+    outcome is 1 for a win, 0.5 for a tie & 0 for a loss; margin is their final points minus their opponent's"""
+    features: np.ndarray
+    masks: np.ndarray
+    moves: np.ndarray
+    outcomes: np.ndarray
+    margins: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+
+PoliciesFactory = Callable[[np.random.Generator], list[BatchPolicy]]
+
+
+def bot_policies(rng: np.random.Generator) -> list[BatchPolicy]:
+    return [BotPolicy(rng), BotPolicy(rng)]
+
+
+@dataclass
+class _RecordingPolicy:
+    """Passes policy's choices through, noting each game's move_index in moves"""
+    policy: BatchPolicy
+    moves: np.ndarray
+
+    def choose(self, games: BatchGames, rows: np.ndarray, seat: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        cards, play_to, draw_from = self.policy.choose(games, rows, seat)
+        self.moves[rows] = cards * 4 + play_to * 2 + draw_from
+        return cards, play_to, draw_from
+
+
+def _self_play_shard(n_games: int, seed: int, shard_idx: int, max_rounds: int,
+                     policies_factory: PoliciesFactory) -> SelfPlayBatch:
+    """Every position of n_games batch-engine games, in shuffled order"""
+    rng = np.random.default_rng([seed, shard_idx])
+    games = BatchGames(n_games, max_rounds, int(rng.integers(2 ** 63)))
+    encoder, moves = FeatureEncoder(), np.zeros(n_games, dtype=np.int16)
+    policies = [_RecordingPolicy(policy, moves) for policy in policies_factory(rng)]
+    steps = []
+    while len(rows := games.active_rows):
+        features, masks = encoder.encode_games(games, rows)
+        seats = games.turn[rows]
+        games.step(policies)
+        steps.append((rows, seats, features, masks, moves[rows]))
+    rows, seats, features, masks, played = (np.concatenate(arrays) for arrays in zip(*steps))
+    winners = games.winners[rows]
+    outcomes = np.where(winners[np.arange(len(rows)), seats], 1 / winners.sum(axis=1), 0.0).astype(np.float32)
+    margins = games.scores[rows, seats] - games.scores[rows, 1 - seats]
+    order = rng.permutation(len(rows))
+    return SelfPlayBatch(features[order], masks[order], played[order], outcomes[order], margins[order])
+
+
+def self_play_batches(batch_size: int, n_games: int, policies_factory: PoliciesFactory = bot_policies,
+                      seed: int = 0, max_rounds: int = 3, workers: int | None = None, shard_size: int = 256,
+                      copy: bool = False) -> Iterator[SelfPlayBatch]:
+    """Plays n_games across a process pool, shard_size games per batch-engine run, & yields their positions in
+    batches of batch_size (the last may be short) as shards finish. Positions are shuffled within their shard.
+    Batches are filled into one set of preallocated buffers, so each is only valid until the next is requested;
+    pass copy=True to keep them. policies_factory must be picklable & is called with each shard's Generator"""
+    encoder = FeatureEncoder()
+    buffers = SelfPlayBatch(encoder.feature_buffer(batch_size), encoder.mask_buffer(batch_size),
+                            np.zeros(batch_size, dtype=np.int16), np.zeros(batch_size, dtype=np.float32),
+                            np.zeros(batch_size, dtype=np.int32))
+    filled = 0
+
+    def batch(n: int) -> SelfPlayBatch:
+        arrays = (a[:n].copy() if copy else a[:n] for a in (buffers.features, buffers.masks, buffers.moves,
+                                                             buffers.outcomes, buffers.margins))
+        return SelfPlayBatch(*arrays)
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_self_play_shard, min(shard_size, n_games - start), seed, shard_idx, max_rounds,
+                               policies_factory)
+                   for shard_idx, start in enumerate(range(0, n_games, shard_size))]
+        for future in as_completed(futures):
+            shard = future.result()
+            pos = 0
+            while pos < len(shard):
+                n = min(batch_size - filled, len(shard) - pos)
+                for buffer, array in zip((buffers.features, buffers.masks, buffers.moves, buffers.outcomes,
+                                          buffers.margins),
+                                         (shard.features, shard.masks, shard.moves, shard.outcomes, shard.margins)):
+                    buffer[filled:filled + n] = array[pos:pos + n]
+                filled += n
+                pos += n
+                if filled == batch_size:
+                    yield batch(batch_size)
+                    filled = 0
+    if filled:
+        yield batch(filled)
@@ -1,57 +1,153 @@
+import random
 import time
 from dataclasses import dataclass, field
+from typing import Callable
 
 from gamenacki.common.base_renderer import Renderer
-from gamenacki.common.log import Log, Event
+from gamenacki.common.log import Log, Event, EventObserver
 from gamenacki.common.piles import Discard
 
+from gamenacki.lostcitinacki.metrics import EngineMetrics, Phase, skip_lap
+from gamenacki.lostcitinacki.models.bitboard import BitState
 from gamenacki.lostcitinacki.models.constants import Color, DrawFromStack, Action
 from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.moves import Move
 from gamenacki.lostcitinacki.players import Player
 
 
+class EngineEventsMixin:
+    """What LostCities & AsyncLostCities share around their play loops: the opening BEGIN_GAME, logging each event
+    (with metrics, observers & checkpoints) & rebuilding states from the log. Expects gs, log, seed, metrics,
+    observers, max_rounds & player_cnt on the engine"""
+    gs: GameState
+    log: Log
+    seed: int
+    metrics: EngineMetrics
+    observers: list[EventObserver]
+
+    def __post_init__(self):
+        if not self.gs:
+            self.gs = GameState.create_game_state(self.player_cnt, self.max_rounds, random.Random(self.seed))
+        self.log.seed = self.seed
+        self._log(Event(Action.BEGIN_GAME), checkpoint=True)
+
+    def state_at(self, event_idx: int) -> GameState:
+        """Rebuilds the GameState as it was right after log event event_idx"""
+        return self.log.state_at(event_idx, BitState.from_bytes, BitState.replay).to_game_state()
+
+    def _log(self, event: Event, checkpoint: bool = False) -> None:
+        self.log.push(event)
+        if self.metrics is not None:
+            self.metrics.count(event)
+        for observer in self.observers:
+            observer.observe(event, self.gs)
+        if (checkpoint and self.log.retain_events) or self.log.needs_checkpoint:
+            self.log.add_checkpoint(BitState.from_game_state(self.gs).to_bytes())
+
+    def _start_metrics(self) -> Callable[[Phase], None]:
+        """Starts the game's metrics & returns the lap function the play loop times its phases with"""
+        if self.metrics is None:
+            return skip_lap
+        self.metrics.start()
+        return self.metrics.lap
+
+    def _count_error(self) -> None:
+        if self.metrics is not None:
+            self.metrics.error_cnt += 1
+
+
 @dataclass
-class LostCities:
+class LostCities(EngineEventsMixin):
+    """seed is recorded in the log & seeds the game's rng when no GameState is given.
+    With metrics, play() times each phase & counts turns, rounds, errors & draws into it; see metrics.py.
+    observers are shown every logged event with the GameState, e.g. beliefs.BeliefTrackers"""
     players: list[Player]
     renderer: Renderer
     gs: GameState = None
     log: Log = field(default_factory=Log)
     max_rounds: int = 3
-
-    def __post_init__(self):
-        if not self.gs:
-            self.gs = GameState.create_game_state(self.player_cnt, self.max_rounds)
-        self.log.push(Event(self.gs, Action.BEGIN_GAME))
+    round_end_delay: float = 2
+    seed: int = None
+    metrics: EngineMetrics = field(default=None, repr=False)
+    observers: list[EventObserver] = field(default_factory=list, repr=False)
 
     @property
     def player_cnt(self) -> int:
         return len(self.players)
 
+    def new_game(self, players: list[Player] | None = None, rng: random.Random | None = None, seed: int = None,
+                 log: Log | None = None) -> None:
+        """Readies this engine for another game on the same GameState, its piles & ledgers reset in place rather
+        than rebuilt; the game's rng is rng, else random.Random(seed), & its events go to log, else a new Log"""
+        if players is not None:
+            if len(players) != self.gs.player_cnt:
+                raise ValueError(f"This engine's games are for {self.gs.player_cnt} players, not {len(players)}")
+            self.players = players
+        self.seed = seed
+        self.gs.reset_game(rng or random.Random(seed))
+        self.log = log if log is not None else Log()
+        self.log.seed = seed
+        self._log(Event(Action.BEGIN_GAME), checkpoint=True)
+
     def play(self) -> None:
+        lap = self._start_metrics()
+        self._log(Event(Action.BEGIN_ROUND), checkpoint=True)
+        lap(Phase.LOG)
         while not self.gs.is_game_over:
-            self.log.push(Event(self.gs, Action.BEGIN_ROUND))
             self.renderer.render(self.gs, self.players)
+            lap(Phase.RENDER)
             turn_idx = self.gs.dealer.player_turn_idx
             player = self.players[turn_idx]
             try:
-                selected_card, play_to_stack = player.play_card(self.gs.piles.hands[turn_idx], self.gs.board_playable_cards)
+                move: Move | None = player.choose_move(self.gs)
+                if move is None:
+                    selected_card, play_to_stack = player.play_card(self.gs.piles.hands[turn_idx], self.gs.board_playable_cards)
+                elif not self.gs.is_legal_move(turn_idx, move):
+                    raise ValueError(f"{move} is not a legal move")
+                else:
+                    selected_card, play_to_stack = move.card, move.play_to
+                lap(Phase.DECISION)
                 color_or_discard: Color | Discard = self.gs.play_card_to(turn_idx, selected_card, play_to_stack)
-                self.log.push(Event(self.gs, Action.PLAY_CARD, turn_idx))
-                can_pick_up_discard: bool = not isinstance(color_or_discard, Discard) and len(self.gs.piles.discard) > 0
-                drawing_from: DrawFromStack = player.pick_up_from(can_pick_up_discard, self.gs.is_discard_card_playable)
-                self.gs.draw_from(turn_idx, drawing_from)
-                self.log.push(Event(self.gs, Action.PICKUP_CARD, turn_idx))
+                lap(Phase.PLAY_CARD)
+                self._log(Event(Action.PLAY_CARD, turn_idx, selected_card.idx, dest=play_to_stack))
+                lap(Phase.LOG)
+                if move is None:
+                    can_pick_up_discard: bool = not isinstance(color_or_discard, Discard) and len(self.gs.piles.discard) > 0
+                    drawing_from: DrawFromStack = player.pick_up_from(can_pick_up_discard, self.gs.is_discard_card_playable)
+                    lap(Phase.DECISION)
+                else:
+                    drawing_from = move.draw_from
+                drawn_card = self.gs.draw_from(turn_idx, drawing_from)
+                lap(Phase.DRAW)
+                self._log(Event(Action.PICKUP_CARD, turn_idx, drawn_card.idx, source=drawing_from))
+                lap(Phase.LOG)
 
             except Exception as ex:
+                lap(Phase.ERROR)
+                self._count_error()
                 self.renderer.render_error(ex)
+                lap(Phase.RENDER)
 
             if self.gs.is_round_over:
                 self.gs.assign_points()
+                lap(Phase.SCORING)
                 self.renderer.render(self.gs, self.players)
-                self.log.push(Event(self.gs, Action.END_ROUND))
-                time.sleep(2)
-                self.gs.create_new_round()
+                lap(Phase.RENDER)
+                self._log(Event(Action.END_ROUND))
+                lap(Phase.LOG)
+                if self.round_end_delay:
+                    time.sleep(self.round_end_delay)
+                    lap(Phase.DELAY)
+                if not self.gs.is_game_over:
+                    self.gs.create_new_round()
+                    lap(Phase.DEAL)
+                    self._log(Event(Action.BEGIN_ROUND), checkpoint=True)
+                    lap(Phase.LOG)
 
         self.renderer.render(self.gs, self.players)
-        self.log.push(Event(self.gs, Action.END_GAME))
+        lap(Phase.RENDER)
+        self._log(Event(Action.END_GAME))
+        self.log.close()
+        lap(Phase.LOG)
         self.renderer.render_log(self.log)
+        lap(Phase.RENDER)
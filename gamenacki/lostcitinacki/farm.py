@@ -0,0 +1,90 @@
+"""A process-pool driver for headless simulation: shards a run of games across cores & streams back GameResults.
+Every shard is a disjoint, contiguous range of game indices, and game i is always seeded with seed + i,
+so a farm run returns exactly the same results as simulation.simulate with the same arguments.
+Only the small GameResult records cross process boundaries; GameState & Log objects stay in the workers.
+players_factory must be picklable, i.e. a module-level function or a functools.partial of one.
+With record_dir, each shard streams its games to its own record file there, named by its game index range."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace as dataclass_replace
+from pathlib import Path
+from typing import Iterator
+
+from gamenacki.lostcitinacki.simulation import GameResult, PlayersFactory, simulate
+
+
+@dataclass
+class FarmSummary:
+    """Running aggregate of GameResults; results may be added in any order"""
+    player_cnt: int
+    game_cnt: int = 0
+    tie_cnt: int = 0
+    turn_cnt: int = 0
+    error_cnt: int = 0
+    win_cnts: list[int] = field(default_factory=list)
+    point_totals: list[int] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.win_cnts = self.win_cnts or [0] * self.player_cnt
+        self.point_totals = self.point_totals or [0] * self.player_cnt
+
+    def add(self, result: GameResult) -> None:
+        self.game_cnt += 1
+        self.turn_cnt += result.turns
+        self.error_cnt += result.error_cnt
+        if len(result.winners) > 1:
+            self.tie_cnt += 1
+        for p_idx in result.winners:
+            self.win_cnts[p_idx] += 1
+        for p_idx, points in enumerate(result.points):
+            self.point_totals[p_idx] += points
+
+    @property
+    def win_rates(self) -> list[float]:
+        return [w / self.game_cnt if self.game_cnt else 0.0 for w in self.win_cnts]
+
+    @property
+    def avg_points(self) -> list[float]:
+        return [p / self.game_cnt if self.game_cnt else 0.0 for p in self.point_totals]
+
+
+def _run_shard(start: int, stop: int, players_factory: PlayersFactory, seed: int, max_rounds: int,
+               record_dir: str | None, record_suffix: str) -> list[GameResult]:
+    record_path = Path(record_dir) / f'games-{start:09d}-{stop:09d}{record_suffix}' if record_dir else None
+    return [dataclass_replace(r, game_idx=r.game_idx + start)
+            for r in simulate(stop - start, players_factory, seed + start, max_rounds, record_path)]
+
+
+def iter_farm_results(n_games: int, players_factory: PlayersFactory, seed: int = 0, max_rounds: int = 3,
+                      workers: int | None = None, shard_size: int | None = None, record_dir: str | None = None,
+                      record_suffix: str = '.lcr.gz') -> Iterator[GameResult]:
+    """Yields GameResults shard by shard as workers finish them; the order across shards is not deterministic,
+    but the result of each game is"""
+    workers = workers or os.cpu_count() or 1
+    shard_size = shard_size or max(1, min(500, -(-n_games // (workers * 4))))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_shard, start, min(start + shard_size, n_games), players_factory, seed, max_rounds,
+                               record_dir, record_suffix) for start in range(0, n_games, shard_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def farm(n_games: int, players_factory: PlayersFactory, seed: int = 0, max_rounds: int = 3,
+         workers: int | None = None, shard_size: int | None = None, record_dir: str | None = None,
+         record_suffix: str = '.lcr.gz') -> list[GameResult]:
+    """Runs n_games across a process pool & returns the results ordered by game index"""
+    results = iter_farm_results(n_games, players_factory, seed, max_rounds, workers, shard_size, record_dir,
+                                record_suffix)
+    return sorted(results, key=lambda r: r.game_idx)
+
+
+def farm_summary(n_games: int, players_factory: PlayersFactory, player_cnt: int = 2, seed: int = 0,
+                 max_rounds: int = 3, workers: int | None = None, shard_size: int | None = None,
+                 record_dir: str | None = None, record_suffix: str = '.lcr.gz') -> FarmSummary:
+    """Runs n_games across a process pool, aggregating results as they stream in rather than keeping them"""
+    summary = FarmSummary(player_cnt)
+    for result in iter_farm_results(n_games, players_factory, seed, max_rounds, workers, shard_size, record_dir,
+                                    record_suffix):
+        summary.add(result)
+    return summary
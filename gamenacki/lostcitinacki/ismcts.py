@@ -0,0 +1,174 @@
+"""Information-set Monte Carlo tree search (single observer) over GameState.
+Each iteration determinizes the hidden information -- the other players' hands & the deck order -- from what the
+observer has seen (with known_hands, e.g. a BeliefTracker's, that includes the others' discard pickups), walks the
+shared tree with UCB over the moves legal in that determinization, then plays random legal moves to the end of the
+round. Rewards are 1 for the leader in total points (ledger + this round's board), shared on ties.
+
+The search is anytime: best_move can be read between iterations, and run stops on an iteration or time budget.
+parallel_search runs independent searches in worker processes & merges their root statistics."""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from gamenacki.lostcitinacki.models.bitboard import ALL_CARDS_MASK, to_cards, to_mask
+from gamenacki.lostcitinacki.models.cards import CARDS, CARDS_PER_COLOR
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.moves import Move, MOVES
+
+
+def canonical_move(m: Move) -> Move:
+    """A color's handshakes are interchangeable, so moves with any of them share the first handshake's Move"""
+    if m.card.value:
+        return m
+    return MOVES[CARDS[m.card.idx - m.card.idx % CARDS_PER_COLOR], m.play_to, m.draw_from]
+
+
+def determinize(gs: GameState, observer_idx: int, rng: random.Random,
+                known_hands: list[int] | None = None) -> GameState:
+    """A clone of gs in which the cards the observer can't see are dealt at random into the other hands & the deck.
+    known_hands[p_idx] masks cards the observer knows are in p_idx's hand, e.g. a BeliefTracker's (the other
+    players' discard pickups); those stay put & only the rest of each hand is dealt"""
+    d = gs.clone()
+    hands = d.piles.hands
+    known = [h.mask & known_hands[p_idx] if known_hands and p_idx != observer_idx else 0
+             for p_idx, h in enumerate(hands)]
+    seen = hands[observer_idx].mask | to_mask(d.piles.discard)
+    for board in d.piles.exp_boards:
+        seen |= board.mask
+    for known_mask in known:
+        seen |= known_mask
+    unseen = to_cards(ALL_CARDS_MASK & ~seen)
+    rng.shuffle(unseen)
+    hidden_piles = [(h, known[p_idx]) for p_idx, h in enumerate(hands) if p_idx != observer_idx] + [(d.piles.deck, 0)]
+    for pile, known_mask in hidden_piles:
+        dealt_cnt = len(pile) - known_mask.bit_count()
+        pile.clear()
+        pile.extend(to_cards(known_mask))
+        pile.extend(unseen[:-dealt_cnt - 1:-1])  # As dealt_cnt pops off unseen would push them
+        del unseen[len(unseen) - dealt_cnt:]
+    d.rehash()
+    return d
+
+
+def round_rewards(gs: GameState) -> list[float]:
+    totals = [ledger.total + board.points for ledger, board in zip(gs.scorer.ledgers, gs.piles.exp_boards)]
+    winners = [p_idx for p_idx, total in enumerate(totals) if total == max(totals)]
+    return [1 / len(winners) if p_idx in winners else 0.0 for p_idx in range(len(totals))]
+
+
+@dataclass(slots=True, eq=False)
+class Node:
+    move: Move | None = None
+    player_idx: int | None = None
+    children: dict[Move, "Node"] = field(default_factory=dict)
+    visits: int = 0
+    availability: int = 0
+    reward: float = 0.0
+
+
+@dataclass
+class ISMCTS:
+    gs: GameState
+    observer_idx: int
+    exploration: float = 0.7
+    rng: random.Random = field(default=None, repr=False)
+    known_hands: list[int] | None = field(default=None, repr=False)
+    root: Node = field(default_factory=Node, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.rng is None:
+            self.rng = random.Random()
+
+    @property
+    def iteration_cnt(self) -> int:
+        return self.root.visits
+
+    @property
+    def best_move(self) -> Move | None:
+        """The most visited legal move so far, as a Move of the real GameState"""
+        real_moves = {canonical_move(m): m for m in self.gs.legal_moves(self.observer_idx)}
+        visited = [(n.visits, n.reward, real_moves[k]) for k, n in self.root.children.items() if k in real_moves]
+        if not visited:
+            return next(iter(real_moves.values()), None)
+        return max(visited, key=lambda t: t[:2])[2]
+
+    def run(self, iterations: int | None = None, time_limit: float | None = None) -> Move | None:
+        """Iterates until either budget is spent & returns best_move; time_limit is in seconds"""
+        if iterations is None and time_limit is None:
+            raise ValueError("An iteration or time budget must be provided")
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        done = 0
+        while (iterations is None or done < iterations) and (deadline is None or time.perf_counter() < deadline):
+            self.iterate()
+            done += 1
+        return self.best_move
+
+    def iterate(self) -> None:
+        d = determinize(self.gs, self.observer_idx, self.rng, self.known_hands)
+        node, path = self.root, []
+        while not d.is_round_over:
+            turn_idx = d.dealer.player_turn_idx
+            legal = {canonical_move(m): m for m in d.legal_moves(turn_idx)}
+            for key in legal:
+                if key in node.children:
+                    node.children[key].availability += 1
+            untried = [key for key in legal if key not in node.children]
+            if untried:
+                key = self.rng.choice(untried)
+                child = Node(key, turn_idx, availability=1)
+                node.children[key] = child
+                node = child
+                d.apply(legal[key])
+                path.append(node)
+                break
+            node = max((node.children[key] for key in legal), key=self._ucb)
+            d.apply(legal[node.move])
+            path.append(node)
+        self._rollout(d)
+        rewards = round_rewards(d)
+        self.root.visits += 1
+        for n in path:
+            n.visits += 1
+            n.reward += rewards[n.player_idx]
+
+    def _ucb(self, n: Node) -> float:
+        return n.reward / n.visits + self.exploration * math.sqrt(math.log(n.availability) / n.visits)
+
+    def _rollout(self, d: GameState) -> None:
+        while not d.is_round_over:
+            d.apply(self.rng.choice(d.legal_moves(d.dealer.player_turn_idx)))
+
+    def root_stats(self) -> dict[Move, tuple[int, float]]:
+        return {key: (n.visits, n.reward) for key, n in self.root.children.items()}
+
+
+def _search_worker(gs: GameState, observer_idx: int, iterations: int | None, time_limit: float | None,
+                   exploration: float, seed: int, known_hands: list[int] | None) -> dict[Move, tuple[int, float]]:
+    search = ISMCTS(gs, observer_idx, exploration, random.Random(seed), known_hands)
+    search.run(iterations, time_limit)
+    return search.root_stats()
+
+
+def parallel_search(gs: GameState, observer_idx: int, iterations: int | None = None, time_limit: float | None = None,
+                    workers: int | None = None, exploration: float = 0.7, seed: int = 0,
+                    known_hands: list[int] | None = None) -> Move | None:
+    """Root-parallel ISMCTS: each worker searches independently with its own seed & share of the iterations,
+    then root visits & rewards are summed. time_limit applies to every worker"""
+    workers = workers or os.cpu_count() or 1
+    worker_iterations = -(-iterations // workers) if iterations is not None else None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_search_worker, gs, observer_idx, worker_iterations, time_limit, exploration, seed + i,
+                               known_hands) for i in range(workers)]
+        merged: dict[Move, list] = {}
+        for future in futures:
+            for key, (visits, reward) in future.result().items():
+                totals = merged.setdefault(key, [0, 0.0])
+                totals[0] += visits
+                totals[1] += reward
+    real_moves = {canonical_move(m): m for m in gs.legal_moves(observer_idx)}
+    ranked = sorted(((v, r, k) for k, (v, r) in merged.items() if k in real_moves), key=lambda t: t[:2], reverse=True)
+    return real_moves[ranked[0][2]] if ranked else next(iter(real_moves.values()), None)
@@ -0,0 +1,99 @@
+"""Opt-in instrumentation of the LostCities play loop.
+Give the engine an EngineMetrics & it times each phase of play & counts turns, rounds, caught exceptions & where
+cards were drawn from. Timing is lap-based: each lap charges the time since the previous lap to one Phase, so every
+second of play() is accounted for exactly once.
+One EngineMetrics may be shared by many games in a row; objects from separate runs or processes combine with merge.
+Without metrics the engine only pays for a no-op call per phase."""
+
+import time
+from dataclasses import dataclass, field
+from enum import StrEnum, auto
+
+from gamenacki.common.log import Event
+from gamenacki.lostcitinacki.models.constants import Action, DrawFromStack
+
+
+class Phase(StrEnum):
+    DECISION = auto()
+    PLAY_CARD = auto()
+    DRAW = auto()
+    SCORING = auto()
+    DEAL = auto()
+    RENDER = auto()
+    LOG = auto()
+    DELAY = auto()
+    ERROR = auto()
+
+
+def skip_lap(phase: Phase) -> None:
+    """Stands in for EngineMetrics.lap when instrumentation is off"""
+
+
+@dataclass
+class EngineMetrics:
+    game_cnt: int = 0
+    round_cnt: int = 0
+    turn_cnt: int = 0
+    error_cnt: int = 0
+    deck_draw_cnt: int = 0
+    discard_draw_cnt: int = 0
+    phase_seconds: dict[Phase, float] = field(default_factory=lambda: dict.fromkeys(Phase, 0.0))
+    phase_cnts: dict[Phase, int] = field(default_factory=lambda: dict.fromkeys(Phase, 0))
+    _last_lap: float = field(default=0.0, repr=False, compare=False)
+
+    def start(self) -> None:
+        """Starts the clock; the first lap is measured from here"""
+        self._last_lap = time.perf_counter()
+
+    def lap(self, phase: Phase) -> None:
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self._last_lap
+        self.phase_cnts[phase] += 1
+        self._last_lap = now
+
+    def count(self, event: Event) -> None:
+        if event.action == Action.PLAY_CARD:
+            self.turn_cnt += 1
+        elif event.action == Action.PICKUP_CARD:
+            if event.source == DrawFromStack.DISCARD:
+                self.discard_draw_cnt += 1
+            else:
+                self.deck_draw_cnt += 1
+        elif event.action == Action.BEGIN_ROUND:
+            self.round_cnt += 1
+        elif event.action == Action.END_GAME:
+            self.game_cnt += 1
+
+    def merge(self, other: "EngineMetrics") -> "EngineMetrics":
+        """Adds other's timers & counters into this one & returns it"""
+        self.game_cnt += other.game_cnt
+        self.round_cnt += other.round_cnt
+        self.turn_cnt += other.turn_cnt
+        self.error_cnt += other.error_cnt
+        self.deck_draw_cnt += other.deck_draw_cnt
+        self.discard_draw_cnt += other.discard_draw_cnt
+        for phase in Phase:
+            self.phase_seconds[phase] += other.phase_seconds[phase]
+            self.phase_cnts[phase] += other.phase_cnts[phase]
+        return self
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phase_seconds.values())
+
+    @property
+    def discard_draw_share(self) -> float:
+        """The fraction of draws taken from the discard rather than the deck"""
+        draw_cnt = self.deck_draw_cnt + self.discard_draw_cnt
+        return self.discard_draw_cnt / draw_cnt if draw_cnt else 0.0
+
+    def report(self) -> str:
+        total = self.total_seconds or 1.0
+        lines = [f"{self.game_cnt} games, {self.round_cnt} rounds, {self.turn_cnt} turns, {self.error_cnt} errors; "
+                 f"{self.discard_draw_share:.1%} of draws from the discard",
+                 f"{'phase':<10}{'seconds':>12}{'share':>8}{'laps':>10}{'µs/lap':>10}"]
+        for phase in Phase:
+            seconds, cnt = self.phase_seconds[phase], self.phase_cnts[phase]
+            per_lap = seconds / cnt * 1e6 if cnt else 0.0
+            lines.append(f"{phase:<10}{seconds:>12.4f}{seconds / total:>8.1%}{cnt:>10}{per_lap:>10.1f}")
+        return '\n'.join(lines)
@@ -0,0 +1,217 @@
+"""A compact alternative to the Piles/ExpeditionBoard/Hand object graph, for search & mass simulation.
+Cards are referred to by their idx in cards.CARDS. Hands & expedition boards are int bitmasks (bit i = CARDS[i]);
+the deck & discard are lists of card idxs with the top card last, as in Stack.
+Because a color's cards sit in consecutive bits, one color of a board is a CARDS_PER_COLOR-bit chunk and its points,
+max value & playable cards are single table lookups.
+
+BitState converts to & from GameState. Hands & expeditions are sets here, so a round trip keeps every card where it
+was but returns hands & expeditions ordered by card idx. to_bytes packs a BitState into ~100 bytes for checkpoints."""
+
+import random
+import struct
+from dataclasses import dataclass
+
+from gamenacki.common.log import Event
+
+from gamenacki.common.dealer import Dealer
+from gamenacki.common.piles import Hand, Discard
+from gamenacki.common.scorer import Ledger, Scorer, WinCondition
+from gamenacki.lostcitinacki.models.cards import CARDS, CARDS_PER_COLOR, Card, Handshake
+from gamenacki.lostcitinacki.models.constants import Action, Color, PlayToStack, DrawFromStack
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.piles import Deck, Expedition, ExpeditionBoard, Piles
+
+COLORS: list[Color] = list(Color)
+COLOR_CHUNK = (1 << CARDS_PER_COLOR) - 1
+ALL_CARDS_MASK = (1 << len(CARDS)) - 1
+TEN_MASK = sum(1 << c.idx for c in CARDS if c.value == 10)
+MASK_BYTES = -(-len(CARDS) // 8)
+
+
+def _chunk_cards(chunk: int) -> list[Card]:
+    """The cards of the first color whose bits are set in chunk; all colors share the same values"""
+    return [CARDS[i] for i in range(CARDS_PER_COLOR) if chunk >> i & 1]
+
+
+def _chunk_points(chunk: int) -> int:
+    """Mirrors Expedition.points"""
+    cards = _chunk_cards(chunk)
+    if not cards:
+        return 0
+    plus_minus = sum(c.value for c in cards) - 20
+    multiplier = 1 + sum(1 for c in cards if isinstance(c, Handshake))
+    bonus = 20 if len(cards) >= 8 else 0
+    return plus_minus * multiplier + bonus
+
+
+def _chunk_playable(color_max: int) -> int:
+    """The chunk of cards that may still be played onto a color whose highest card is color_max"""
+    return sum(1 << i for i, c in enumerate(_chunk_cards(COLOR_CHUNK)) if c.value > color_max or color_max == 0)
+
+
+CHUNK_POINTS: tuple[int, ...] = tuple(_chunk_points(m) for m in range(1 << CARDS_PER_COLOR))
+CHUNK_MAX_VALUE: tuple[int, ...] = tuple(max([c.value for c in _chunk_cards(m)], default=0)
+                                         for m in range(1 << CARDS_PER_COLOR))
+CHUNK_PLAYABLE: dict[int, int] = {v: _chunk_playable(v) for v in set(CHUNK_MAX_VALUE)}
+
+
+def to_mask(cards) -> int:
+    mask = 0
+    for c in cards:
+        mask |= 1 << c.idx
+    return mask
+
+
+def to_cards(mask: int) -> list[Card]:
+    cards = []
+    while mask:
+        low_bit = mask & -mask
+        cards.append(CARDS[low_bit.bit_length() - 1])
+        mask ^= low_bit
+    return cards
+
+
+@dataclass(slots=True)
+class BitState:
+    hands: list[int]
+    boards: list[int]
+    deck: list[int]
+    discard: list[int]
+    player_turn_idx: int
+    dealer_idx: int
+    round_number: int
+    max_rounds: int
+    ledgers: tuple[tuple[int, ...], ...]
+
+    @classmethod
+    def from_game_state(cls, gs: GameState) -> "BitState":
+        return cls(hands=[h.mask for h in gs.piles.hands], boards=[board.mask for board in gs.piles.exp_boards],
+                   deck=[c.idx for c in gs.piles.deck], discard=[c.idx for c in gs.piles.discard],
+                   player_turn_idx=gs.dealer.player_turn_idx, dealer_idx=gs.dealer.dealer_idx,
+                   round_number=gs.dealer.current_round_number, max_rounds=gs.max_rounds,
+                   ledgers=tuple(tuple(ledger.ledger) for ledger in gs.scorer.ledgers))
+
+    def to_game_state(self, rng: random.Random | None = None) -> GameState:
+        """rng becomes the Dealer's rng, used to shuffle the decks of later rounds"""
+        deck = Deck(start_shuffled=False)
+        deck.cards = [CARDS[i] for i in self.deck]
+        boards = [ExpeditionBoard([Expedition(to_cards(mask & COLOR_CHUNK << color_i * CARDS_PER_COLOR), color)
+                                   for color_i, color in enumerate(COLORS)]) for mask in self.boards]
+        piles = Piles(hands=[Hand(to_cards(mask)) for mask in self.hands], deck=deck,
+                      discard=Discard([CARDS[i] for i in self.discard]), exp_boards=boards)
+        dealer = Dealer(self.player_cnt, rng=rng)
+        dealer.dealer_idx, dealer.player_turn_idx = self.dealer_idx, self.player_turn_idx
+        dealer.current_round_number = self.round_number
+        scorer = Scorer([Ledger(list(values)) for values in self.ledgers], WinCondition.HIGHEST_SCORE_W_TIES)
+        return GameState(self.player_cnt, piles, scorer, dealer, self.max_rounds)
+
+    def to_bytes(self) -> bytes:
+        """Header of player_cnt, turn, dealer, round, max_rounds & rounds scored; then each hand & board mask;
+        then the deck & discard as a length-prefixed run of card idxs; then every ledger value as a signed short"""
+        rounds_scored = len(self.ledgers[0]) if self.ledgers else 0
+        packed = bytearray((self.player_cnt, self.player_turn_idx, self.dealer_idx, self.round_number,
+                            self.max_rounds, rounds_scored))
+        for mask in self.hands + self.boards:
+            packed += mask.to_bytes(MASK_BYTES, 'little')
+        for pile in (self.deck, self.discard):
+            packed.append(len(pile))
+            packed += bytes(pile)
+        packed += struct.pack(f'<{self.player_cnt * rounds_scored}h', *(v for ledger in self.ledgers for v in ledger))
+        return bytes(packed)
+
+    @classmethod
+    def from_bytes(cls, packed: bytes) -> "BitState":
+        player_cnt, player_turn_idx, dealer_idx, round_number, max_rounds, rounds_scored = packed[:6]
+        pos = 6
+        masks = []
+        for _ in range(2 * player_cnt):
+            masks.append(int.from_bytes(packed[pos:pos + MASK_BYTES], 'little'))
+            pos += MASK_BYTES
+        piles = []
+        for _ in range(2):
+            pile_len = packed[pos]
+            piles.append(list(packed[pos + 1:pos + 1 + pile_len]))
+            pos += 1 + pile_len
+        values = struct.unpack_from(f'<{player_cnt * rounds_scored}h', packed, pos)
+        ledgers = tuple(values[i * rounds_scored:(i + 1) * rounds_scored] for i in range(player_cnt))
+        return cls(masks[:player_cnt], masks[player_cnt:], piles[0], piles[1], player_turn_idx, dealer_idx,
+                   round_number, max_rounds, ledgers)
+
+    def replay(self, event: Event) -> None:
+        """Applies one logged Event in place; a round's deal can't be replayed, so the log checkpoints every deal"""
+        if event.action == Action.PLAY_CARD:
+            self.play_card_to(event.player_idx, event.card_idx, event.dest)
+        elif event.action == Action.PICKUP_CARD:
+            if self.draw_from(event.player_idx, event.source) != event.card_idx:
+                raise ValueError(f"Replay drew a different card than event {event}")
+        elif event.action == Action.END_ROUND:
+            self.assign_points()
+        elif event.action == Action.BEGIN_ROUND:
+            raise ValueError("A new round's deal can't be replayed; restore from its checkpoint")
+
+    def copy(self) -> "BitState":
+        return BitState(self.hands.copy(), self.boards.copy(), self.deck.copy(), self.discard.copy(),
+                        self.player_turn_idx, self.dealer_idx, self.round_number, self.max_rounds, self.ledgers)
+
+    @property
+    def player_cnt(self) -> int:
+        return len(self.hands)
+
+    @property
+    def all_boards(self) -> int:
+        mask = 0
+        for board in self.boards:
+            mask |= board
+        return mask
+
+    @property
+    def is_round_over(self) -> bool:
+        return not self.deck or self.all_boards & TEN_MASK == TEN_MASK
+
+    @property
+    def is_game_over(self) -> bool:
+        return self.is_round_over and self.round_number >= self.max_rounds
+
+    def color_max(self, color_i: int) -> int:
+        return CHUNK_MAX_VALUE[self.all_boards >> color_i * CARDS_PER_COLOR & COLOR_CHUNK]
+
+    @property
+    def playable_mask(self) -> int:
+        """The cards that may be played to an expedition, whoever holds them; mirrors GameState.board_playable_cards"""
+        all_boards, mask = self.all_boards, 0
+        for color_i in range(len(COLORS)):
+            shift = color_i * CARDS_PER_COLOR
+            mask |= CHUNK_PLAYABLE[CHUNK_MAX_VALUE[all_boards >> shift & COLOR_CHUNK]] << shift
+        return mask
+
+    def board_points(self, p_idx: int) -> int:
+        """Mirrors ExpeditionBoard.points"""
+        board = self.boards[p_idx]
+        return sum(CHUNK_POINTS[board >> color_i * CARDS_PER_COLOR & COLOR_CHUNK] for color_i in range(len(COLORS)))
+
+    def play_card_to(self, p_idx: int, card_idx: int, dest_pile: PlayToStack) -> None:
+        bit = 1 << card_idx
+        if not self.hands[p_idx] & bit:
+            raise ValueError(f"{CARDS[card_idx]} is not in the hand")
+        if dest_pile == PlayToStack.DISCARD:
+            self.discard.append(card_idx)
+        else:
+            c = CARDS[card_idx]
+            max_number_in_color = self.color_max(card_idx // CARDS_PER_COLOR)
+            if not (c.value > max_number_in_color or max_number_in_color == 0):
+                raise ValueError(f"You must play higher than a {max_number_in_color}")
+            self.boards[p_idx] |= bit
+        self.hands[p_idx] ^= bit
+
+    def draw_from(self, p_idx: int, source_pile: DrawFromStack) -> int:
+        """Returns the idx of the drawn card"""
+        source = self.deck if source_pile == DrawFromStack.DECK else self.discard
+        if not source:
+            raise ValueError("There are no cards here")
+        card_idx = source.pop()
+        self.hands[p_idx] |= 1 << card_idx
+        self.player_turn_idx = (self.player_turn_idx + 1) % self.player_cnt
+        return card_idx
+
+    def assign_points(self) -> None:
+        self.ledgers = tuple(ledger + (self.board_points(p_idx),) for p_idx, ledger in enumerate(self.ledgers))
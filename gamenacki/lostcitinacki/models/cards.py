@@ -1,15 +1,31 @@
+"""Cards are interned flyweights: CARDS holds the only instances used in play & every deck, hand and pile holds
+references to them. Cards are immutable and compare by identity, so they hash cheaply & work in sets and as dict keys.
+Each card's idx is its position in CARDS; the cards of a color occupy CARDS_PER_COLOR consecutive indices,
+handshakes first, then the expedition cards in ascending value."""
+
 from dataclasses import dataclass
 
 from gamenacki.lostcitinacki.models.constants import Color
 
+HANDSHAKES_PER_COLOR = 3
+EXPEDITION_VALUES = range(6, 11)
+CARDS_PER_COLOR = HANDSHAKES_PER_COLOR + len(EXPEDITION_VALUES)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class Card:
     color: Color
     value: int
+    idx: int = None
+
+    def __reduce__(self):
+        """Interned cards unpickle & deepcopy back to the same singleton"""
+        if self.idx is None:
+            return type(self), (self.color, self.value)
+        return card_from_idx, (self.idx,)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class Handshake(Card):
     value: int = 0
 
@@ -17,7 +33,22 @@ class Handshake(Card):
         return f'{self.color[0].upper()}H'
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class ExpeditionCard(Card):
     def __repr__(self) -> str:
         return f'{self.color[0].upper()}{self.value}'
+
+
+def _build_cards() -> tuple[Card, ...]:
+    cards = []
+    for color in list(Color):
+        cards += [Handshake(color, 0, len(cards) + i) for i in range(HANDSHAKES_PER_COLOR)]
+        cards += [ExpeditionCard(color, v, len(cards) + i) for i, v in enumerate(EXPEDITION_VALUES)]
+    return tuple(cards)
+
+
+CARDS: tuple[Card, ...] = _build_cards()
+
+
+def card_from_idx(idx: int) -> Card:
+    return CARDS[idx]
@@ -1,12 +1,16 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import random
 
 from gamenacki.common.base_game_state import BaseGameState
 from gamenacki.common.dealer import Dealer
 from gamenacki.common.piles import Hand, Discard
 from gamenacki.common.scorer import Ledger, WinCondition, Scorer
-from gamenacki.lostcitinacki.models.cards import Card
+from gamenacki.lostcitinacki.models.cards import Card, CARDS
 from gamenacki.lostcitinacki.models.constants import Color, PlayToStack, DrawFromStack
+from gamenacki.lostcitinacki.models.moves import Move, MOVES
 from gamenacki.lostcitinacki.models.piles import ExpeditionBoard, Deck, Piles
+from gamenacki.lostcitinacki.models.zobrist import (BOARD_KEYS, DECK_SIZE_KEYS, DISCARD_KEYS, HAND_KEYS, MAX_PLAYERS,
+                                                    MAX_ROUNDS, ROUND_KEYS, TURN_KEYS)
 
 
 @dataclass
@@ -16,18 +20,31 @@ class GameState(BaseGameState):
         piles: Piles
         scorer: Scorer
         dealer: Dealer
+    color maxima & the board-playable cards are kept up to date as cards are played, rather than rescanned,
+    as is zobrist_hash
     """
     max_rounds: int
+    _color_maxes: dict[Color, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _playable_cards: frozenset[Card] = field(default_factory=frozenset, init=False, repr=False, compare=False)
+    _undo_stack: list[tuple] = field(default_factory=list, init=False, repr=False, compare=False)
+    _hash: int = field(default=0, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        self.create_piles()
-        self.deal()
+        """Piles that already hold hands (e.g. a restored position) are taken as-is rather than created & dealt"""
+        if not 2 <= self.player_cnt <= MAX_PLAYERS:
+            raise ValueError(f"A game is for 2 to {MAX_PLAYERS} players, not {self.player_cnt}")
+        if not self.piles.hands:
+            self.create_piles()
+            self.deal()
+        self._index_board()
 
     @classmethod
-    def create_game_state(cls, player_cnt: int, max_rounds: int):
-        return cls(player_cnt=player_cnt, piles=Piles(),
+    def create_game_state(cls, player_cnt: int, max_rounds: int, rng: random.Random | None = None):
+        """rng is kept by the Dealer & used for every shuffle of the game; pass a seeded one to reproduce a game"""
+        rng = rng or random.Random()
+        return cls(player_cnt=player_cnt, piles=Piles(deck=Deck(rng=rng)),
                    scorer=Scorer([Ledger() for _ in range(player_cnt)], WinCondition.HIGHEST_SCORE_W_TIES),
-                   dealer=Dealer(player_cnt), max_rounds=max_rounds)
+                   dealer=Dealer(player_cnt, rng=rng), max_rounds=max_rounds)
 
     @property
     def has_game_started(self) -> bool:
@@ -43,7 +60,7 @@ class GameState(BaseGameState):
 
     @property
     def is_round_over(self) -> bool:
-        return len(self.piles.deck.cards) == 0 or set(self.color_maxes.values()) == {10}
+        return len(self.piles.deck.cards) == 0 or all(v == 10 for v in self._color_maxes.values())
 
     @property
     def winner(self) -> None | tuple[int, int] | list[tuple[int, int]]:
@@ -52,18 +69,55 @@ class GameState(BaseGameState):
             return None
         return self.scorer.get_winner(self.is_game_over)
 
+    @property
+    def zobrist_hash(self) -> int:
+        """A 64-bit key for the position: hands, expeditions, the discard pile, the deck size (its order is hidden),
+        whose turn it is & the round. Equal positions have equal keys, across processes too; see zobrist.py"""
+        return self._hash
+
     @property
     def color_maxes(self) -> dict[Color: int]:
-        return {c: max([p.get_max_card_in_color(c) for p in self.piles.exp_boards]) for c in list(Color)}
+        return dict(self._color_maxes)
 
     @property
-    def board_playable_cards(self) -> list[Card]:
-        fresh_deck = Deck()
-        return [c for c in fresh_deck if c.value > self.color_maxes[c.color] or self.color_maxes[c.color] == 0]
+    def board_playable_cards(self) -> frozenset[Card]:
+        return self._playable_cards
 
     @property
     def is_discard_card_playable(self) -> bool:
-        return self.piles.discard.peek() in self.board_playable_cards
+        top_card = self.piles.discard.peek()
+        return top_card is not None and self.is_card_playable(top_card)
+
+    def is_card_playable(self, c: Card) -> bool:
+        color_max = self._color_maxes[c.color]
+        return c.value > color_max or color_max == 0
+
+    def legal_moves(self, p_idx: int) -> list[Move]:
+        """Every legal move for p_idx on their turn, in hand order; no exceptions are raised or caught.
+        Interchangeable cards (a color's handshakes) yield moves for only the first of them in the hand"""
+        if self.is_round_over:
+            return []
+        can_draw_discard = len(self.piles.discard) > 0
+        color_maxes, seen_handshake_colors, moves = self._color_maxes, set(), []
+        for c in self.piles.hands[p_idx]:
+            if not c.value:
+                if c.color in seen_handshake_colors:
+                    continue
+                seen_handshake_colors.add(c.color)
+            color_max = color_maxes[c.color]
+            if c.value > color_max or color_max == 0:
+                moves.append(MOVES[c, PlayToStack.EXPEDITION, DrawFromStack.DECK])
+                if can_draw_discard:
+                    moves.append(MOVES[c, PlayToStack.EXPEDITION, DrawFromStack.DISCARD])
+            moves.append(MOVES[c, PlayToStack.DISCARD, DrawFromStack.DECK])
+        return moves
+
+    def is_legal_move(self, p_idx: int, move: Move) -> bool:
+        if move.card not in self.piles.hands[p_idx].cards:
+            return False
+        if move.play_to == PlayToStack.DISCARD:
+            return move.draw_from == DrawFromStack.DECK
+        return self.is_card_playable(move.card) and (move.draw_from == DrawFromStack.DECK or len(self.piles.discard) > 0)
 
     def create_piles(self) -> None:
         for _ in range(self.player_cnt):
@@ -71,14 +125,34 @@ class GameState(BaseGameState):
             self.piles.exp_boards.append(ExpeditionBoard())
 
     def create_new_round(self):
-        [h.clear() for h in self.piles.hands]
-        [e.clear() for e in self.piles.exp_boards]
-        self.piles.deck = Deck()
-        self.piles.discard = Discard()
+        """Resets the piles in place (no new pile objects or card lists) & deals the next round"""
+        self._reset_piles()
         self.dealer.advance_button()
         self.dealer.set_player_idx_as_left_of_dealer()
         self.deal()
         self.dealer.increment_round_number()
+        self._index_board()
+        self._undo_stack.clear()
+
+    def reset_game(self, rng: random.Random | None = None) -> None:
+        """Starts a new game on this GameState's piles, ledgers & dealer, rather than building a new GameState;
+        rng, if given, becomes the game's rng. Shuffles & deals exactly as create_game_state would with that rng"""
+        rng = rng or self.dealer.rng
+        self._reset_piles(rng)
+        self.dealer.reset(rng)
+        for ledger in self.scorer.ledgers:
+            ledger.clear()
+        self.deal()
+        self._index_board()
+        self._undo_stack.clear()
+
+    def _reset_piles(self, rng: random.Random | None = None) -> None:
+        for h in self.piles.hands:
+            h.clear()
+        for board in self.piles.exp_boards:
+            board.clear()
+        self.piles.deck.reset(rng or self.dealer.rng)
+        self.piles.discard.clear()
 
     def deal(self, card_cnt: int = 8):
         self.dealer.deal(self.piles.deck, [_ for _ in self.piles.hands], card_cnt)
@@ -89,17 +163,29 @@ class GameState(BaseGameState):
         if c not in hand.cards:
             raise ValueError(f"{c} is not in the hand")
         if dest_pile == PlayToStack.DISCARD:
-            return self._play_to_discard(hand, c)
+            discard = self._play_to_discard(hand, c)
+            self._hash ^= HAND_KEYS[p_idx][c.idx] ^ DISCARD_KEYS[len(discard) - 1][c.idx]
+            return discard
         else:
-            return self._play_to_exp_pile(hand, c, exp_board)
+            color = self._play_to_exp_pile(hand, c, exp_board)
+            self._hash ^= HAND_KEYS[p_idx][c.idx] ^ BOARD_KEYS[p_idx][c.idx]
+            return color
 
-    def draw_from(self, p_idx: int, source_pile: DrawFromStack):
+    def draw_from(self, p_idx: int, source_pile: DrawFromStack) -> Card:
         hand = self.piles.hands[p_idx]
         returned_card = self.piles.deck.pop() if source_pile == DrawFromStack.DECK else self.piles.discard.pop()
         if not returned_card:
             raise ValueError("There are no cards here")
         hand.push(returned_card)
-        self.dealer.player_turn_idx = self.dealer.next_player_idx()
+        if source_pile == DrawFromStack.DECK:
+            deck_size = len(self.piles.deck)
+            self._hash ^= DECK_SIZE_KEYS[deck_size + 1] ^ DECK_SIZE_KEYS[deck_size]
+        else:
+            self._hash ^= DISCARD_KEYS[len(self.piles.discard)][returned_card.idx]
+        next_idx = self.dealer.next_player_idx()
+        self._hash ^= HAND_KEYS[p_idx][returned_card.idx] ^ TURN_KEYS[p_idx] ^ TURN_KEYS[next_idx]
+        self.dealer.player_turn_idx = next_idx
+        return returned_card
 
     def _play_to_discard(self, h: Hand, c: Card) -> Discard:
         h.remove(c)
@@ -107,14 +193,90 @@ class GameState(BaseGameState):
         return self.piles.discard
 
     def _play_to_exp_pile(self, h: Hand, c: Card, exp_board: ExpeditionBoard) -> Color:
-        dest_pile = next(pile for pile in exp_board.expeditions if pile.color == c.color)
-        max_number_in_color = max([p.get_max_card_in_color(c.color) for p in self.piles.exp_boards])
-        if max_number_in_color > c.value > 0:
+        dest_pile = exp_board.get_expedition(c.color)
+        max_number_in_color = self._color_maxes[c.color]
+        if not self.is_card_playable(c):
             raise ValueError(f"You must play higher than a {max_number_in_color}")
         h.remove(c)
         dest_pile.push(c)
+        if c.value > max_number_in_color:
+            self._raise_color_max(c.color, c.value)
         return dest_pile.color
 
+    def apply(self, move: Move) -> None:
+        """Plays a whole turn in place for the player whose turn it is; undo(move) reverts it exactly"""
+        p_idx = self.dealer.player_turn_idx
+        if move.play_to == PlayToStack.DISCARD and move.draw_from == DrawFromStack.DISCARD:
+            raise ValueError("You cannot pick up the card you just discarded")
+        hand_cards = self.piles.hands[p_idx].cards
+        hand_pos = hand_cards.index(move.card) if move.card in hand_cards else None
+        undo_record = (move, p_idx, hand_pos, self._color_maxes[move.card.color], self._playable_cards, self._hash)
+        self.play_card_to(p_idx, move.card, move.play_to)
+        source_pile = self.piles.deck if move.draw_from == DrawFromStack.DECK else self.piles.discard
+        if not len(source_pile):
+            self._unplay(undo_record)
+            raise ValueError("There are no cards here")
+        self.draw_from(p_idx, move.draw_from)
+        self._undo_stack.append(undo_record)
+
+    def undo(self, move: Move) -> None:
+        """Reverts the most recent apply, which must have been given move"""
+        if not self._undo_stack or self._undo_stack[-1][0] != move:
+            raise ValueError(f"{move} is not the most recently applied move")
+        undo_record = self._undo_stack.pop()
+        p_idx = undo_record[1]
+        source_pile = self.piles.deck if move.draw_from == DrawFromStack.DECK else self.piles.discard
+        source_pile.push(self.piles.hands[p_idx].pop())
+        self.dealer.player_turn_idx = p_idx
+        self._unplay(undo_record)
+
+    def _unplay(self, undo_record: tuple) -> None:
+        move, p_idx, hand_pos, color_max, playable_cards, state_hash = undo_record
+        if move.play_to == PlayToStack.DISCARD:
+            self.piles.discard.pop()
+        else:
+            self.piles.exp_boards[p_idx].get_expedition(move.card.color).pop()
+        self.piles.hands[p_idx].insert(hand_pos, move.card)
+        self._color_maxes[move.card.color] = color_max
+        self._playable_cards = playable_cards
+        self._hash = state_hash
+
+    def clone(self) -> "GameState":
+        """A cheap copy for search: the piles, the Dealer's turn tracking & the board indexes are copied,
+        while the Scorer & the Dealer's rng are shared with the original, so a clone must not assign points"""
+        gs = object.__new__(GameState)
+        gs.__dict__.update(self.__dict__)
+        gs.piles = self.piles.copy()
+        gs.dealer = object.__new__(Dealer)
+        gs.dealer.__dict__.update(self.dealer.__dict__)
+        gs._color_maxes = self._color_maxes.copy()
+        gs._undo_stack = self._undo_stack.copy()
+        return gs
+
+    def _index_board(self) -> None:
+        """Rebuilds the color maxima, playable cards & hash from the piles; needed only when a round begins"""
+        self._color_maxes = {c: max([p.get_max_card_in_color(c) for p in self.piles.exp_boards], default=0)
+                             for c in list(Color)}
+        self._playable_cards = frozenset(c for c in CARDS if self.is_card_playable(c))
+        self.rehash()
+
+    def rehash(self) -> None:
+        """Recomputes zobrist_hash from scratch; only needed after the piles are edited directly"""
+        state_hash = (TURN_KEYS[self.dealer.player_turn_idx] ^ DECK_SIZE_KEYS[len(self.piles.deck)]
+                      ^ ROUND_KEYS[self.dealer.current_round_number % MAX_ROUNDS])
+        for p_idx, (hand, board) in enumerate(zip(self.piles.hands, self.piles.exp_boards)):
+            for c in hand:
+                state_hash ^= HAND_KEYS[p_idx][c.idx]
+            for c in (c for exp in board for c in exp):
+                state_hash ^= BOARD_KEYS[p_idx][c.idx]
+        for pos, c in enumerate(self.piles.discard):
+            state_hash ^= DISCARD_KEYS[pos][c.idx]
+        self._hash = state_hash
+
+    def _raise_color_max(self, color: Color, value: int) -> None:
+        self._color_maxes[color] = value
+        self._playable_cards = frozenset(c for c in self._playable_cards if c.color != color or c.value > value)
+
     def assign_points(self) -> None:
         for pl, exp_board in zip(self.scorer.ledgers, self.piles.exp_boards):
             pl.add_a_value(exp_board.points)
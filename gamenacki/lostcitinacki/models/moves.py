@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+from gamenacki.lostcitinacki.models.cards import Card, CARDS
+from gamenacki.lostcitinacki.models.constants import PlayToStack, DrawFromStack
+
+
+@dataclass(frozen=True, slots=True)
+class Move:
+    """A whole turn: the card played, where it's played to & where the replacement card is drawn from"""
+    card: Card
+    play_to: PlayToStack
+    draw_from: DrawFromStack
+
+    def __repr__(self) -> str:
+        return f'{self.card!r}>{self.play_to.value}<{self.draw_from.value}'
+
+
+# Every possible Move, built once; the move generator hands these out instead of allocating new ones
+MOVES: dict[tuple[Card, PlayToStack, DrawFromStack], Move] = {
+    (c, play_to, draw_from): Move(c, play_to, draw_from)
+    for c in CARDS for play_to in PlayToStack for draw_from in DrawFromStack
+}
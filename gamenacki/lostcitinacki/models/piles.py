@@ -2,39 +2,102 @@
 
 from dataclasses import dataclass, field
 
-from gamenacki.common.piles import CardStack, BaseDeck, Hand, Discard
-from gamenacki.lostcitinacki.models.cards import Card, Handshake, ExpeditionCard
+from gamenacki.common.piles import IndexedCardStack, BaseDeck, Hand, Discard
+from gamenacki.lostcitinacki.models.cards import Card, Handshake, ExpeditionCard, CARDS
 from gamenacki.lostcitinacki.models.constants import Color
 
 
 @dataclass
-class Expedition(CardStack):
+class Expedition(IndexedCardStack):
+    """Keeps a running value sum, handshake count & max value as cards are pushed & removed, so points & max_value
+    are O(1) rather than a rescan of the cards"""
     color: Color = None
+    _value_sum: int = field(default=0, init=False, repr=False, compare=False)
+    _handshake_cnt: int = field(default=0, init=False, repr=False, compare=False)
+    _max_value: int = field(default=0, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not self.color:
             raise ValueError("Color must be provided")
+        super().__post_init__()
+        self._recount()
 
     def __repr__(self) -> str:
         return f'{self.color.value} {self.cards}'
 
     @property
     def card_cnt(self) -> int:
-        return len(self)
+        return len(self._items)
 
     @property
     def handshake_cnt(self) -> int:
-        return sum([1 for c in self if isinstance(c, Handshake)])
+        return self._handshake_cnt
+
+    @property
+    def max_value(self) -> int:
+        """The highest expedition card's value; 0 if there's none"""
+        return self._max_value
 
     @property
     def points(self) -> int:
-        if not self.card_cnt:
+        if not self._items:
             return 0
-        plus_minus = sum([c.value for c in self]) - 20
-        multiplier = 1 + self.handshake_cnt
-        bonus = 20 if self.card_cnt >= 8 else 0
+        plus_minus = self._value_sum - 20
+        multiplier = 1 + self._handshake_cnt
+        bonus = 20 if len(self._items) >= 8 else 0
         return plus_minus * multiplier + bonus
 
+    def push(self, c: Card):
+        super().push(c)
+        self._count(c)
+
+    def insert(self, idx: int, c: Card):
+        super().insert(idx, c)
+        self._count(c)
+
+    def remove(self, c: Card):
+        super().remove(c)
+        self._uncount(c)
+
+    def pop(self) -> Card | None:
+        c = super().pop()
+        if c is not None:
+            self._uncount(c)
+        return c
+
+    def extend(self, cards: list[Card]) -> None:
+        super().extend(cards)
+        for c in cards:
+            self._count(c)
+
+    def pop_many(self, cnt: int) -> list[Card]:
+        cards = super().pop_many(cnt)
+        self._recount()
+        return cards
+
+    def clear(self) -> None:
+        super().clear()
+        self._recount()
+
+    def _count(self, c: Card) -> None:
+        self._value_sum += c.value
+        if isinstance(c, Handshake):
+            self._handshake_cnt += 1
+        elif c.value > self._max_value:
+            self._max_value = c.value
+
+    def _uncount(self, c: Card) -> None:
+        self._value_sum -= c.value
+        if isinstance(c, Handshake):
+            self._handshake_cnt -= 1
+        elif c.value == self._max_value:
+            self._max_value = max([c.value for c in self if isinstance(c, ExpeditionCard)], default=0)
+
+    def _recount(self) -> None:
+        self._value_sum = self._handshake_cnt = self._max_value = 0
+        for c in self._items:
+            self._count(c)
+
 
 def create_board() -> list[Expedition]:
     return [Expedition([], c) for c in list(Color)]
@@ -45,6 +108,9 @@ class ExpeditionBoard:
     """One ExpeditionBoard is given to each play; it's a collection of color expeditions"""
     expeditions: list[Expedition] = field(default_factory=create_board)
 
+    def __post_init__(self):
+        self._by_color: dict[Color, Expedition] = {pile.color: pile for pile in self.expeditions}
+
     def __repr__(self) -> str:
         return 'Expeditions: ' + ' '.join([ep.__repr__() for ep in self.expeditions])
 
@@ -55,21 +121,32 @@ class ExpeditionBoard:
     def points(self) -> int:
         return sum([p.points for p in self.expeditions])
 
+    @property
+    def mask(self) -> int:
+        """Every card on the board as a bitmask by card idx, as in bitboard.py"""
+        mask = 0
+        for pile in self.expeditions:
+            mask |= pile.mask
+        return mask
+
+    def get_expedition(self, color: Color) -> Expedition:
+        return self._by_color[color]
+
     def get_max_card_in_color(self, color: Color) -> int:
-        numbered_cards = [c.value for p in self for c in p if p.color == color and isinstance(c, ExpeditionCard)]
-        return max(numbered_cards) if numbered_cards else 0
+        return self._by_color[color].max_value
 
     def clear(self) -> None:
         [pile.clear() for pile in self.expeditions]
 
+    def copy(self) -> "ExpeditionBoard":
+        return ExpeditionBoard([pile.copy() for pile in self.expeditions])
+
 
 @dataclass
 class Deck(BaseDeck):
     @staticmethod
     def build_deck() -> list[Card]:
-        handshakes: list[Handshake] = [Handshake(c) for c in list(Color) for _ in range(3)]
-        expeditions: list[ExpeditionCard] = [ExpeditionCard(c, v) for c in list(Color) for v in range(6, 11)]
-        return handshakes + expeditions
+        return list(CARDS)
 
 
 @dataclass
@@ -79,3 +156,7 @@ class Piles:
     deck: Deck = field(default_factory=Deck)
     discard: Discard = field(default_factory=Discard)
     exp_boards: list[ExpeditionBoard] = field(default_factory=list)
+
+    def copy(self) -> "Piles":
+        return Piles(hands=[h.copy() for h in self.hands], deck=self.deck.copy(), discard=self.discard.copy(),
+                     exp_boards=[b.copy() for b in self.exp_boards])
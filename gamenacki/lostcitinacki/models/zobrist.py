@@ -0,0 +1,29 @@
+"""Zobrist keys: a fixed random 64-bit key per (card, place) so any position hashes to the XOR of the keys of where
+its cards are, and a move updates the hash with a few XORs instead of a rescan.
+Places are each player's hand & expedition board & each slot of the deck & discard stacks (order matters there).
+Further keys cover whose turn it is, the round & the deck size, for hashes that treat the deck's order as unknown.
+Keys come from a fixed seed so hashes agree across processes & runs."""
+
+import random
+
+from gamenacki.lostcitinacki.models.cards import CARDS
+
+MAX_PLAYERS = 4
+MAX_ROUNDS = 32  # later rounds reuse keys, round % MAX_ROUNDS
+
+_rng = random.Random(0x10C1A5)
+
+
+def _keys(cnt: int) -> list[int]:
+    return [_rng.getrandbits(64) for _ in range(cnt)]
+
+
+HAND_KEYS: list[list[int]] = [_keys(len(CARDS)) for _ in range(MAX_PLAYERS)]
+BOARD_KEYS: list[list[int]] = [_keys(len(CARDS)) for _ in range(MAX_PLAYERS)]
+DECK_KEYS: list[list[int]] = [_keys(len(CARDS)) for _ in range(len(CARDS))]  # [stack position][card idx]
+DISCARD_KEYS: list[list[int]] = [_keys(len(CARDS)) for _ in range(len(CARDS))]
+TURN_KEYS: list[int] = _keys(MAX_PLAYERS)
+ROUND_KEYS: list[int] = _keys(MAX_ROUNDS)
+DECK_SIZE_KEYS: list[int] = _keys(len(CARDS) + 1)
+
+del _rng
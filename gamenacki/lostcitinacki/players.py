@@ -1,10 +1,17 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+import asyncio
 import random
 import time
 
+from gamenacki.lostcitinacki.beliefs import BeliefTracker
+from gamenacki.lostcitinacki.ismcts import ISMCTS, parallel_search
 from gamenacki.lostcitinacki.models.cards import Card
 from gamenacki.lostcitinacki.models.constants import DrawFromStack, PlayToStack
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.moves import Move, MOVES
+from gamenacki.lostcitinacki.solver import EndgameSolver, solve_determinized
 from gamenacki.common.piles import Hand
 
 
@@ -13,8 +20,13 @@ class Player(ABC):
     idx: int
     name: str
 
+    def choose_move(self, gs: GameState) -> Move | None:
+        """Players that pick a whole turn from the full GameState override this; the engine then skips
+        play_card & pick_up_from. Returning None falls back to them"""
+        return None
+
     @abstractmethod
-    def play_card(self, h: Hand, board_playable_cards: list[Card]) -> tuple[Card, PlayToStack]:
+    def play_card(self, h: Hand, board_playable_cards: frozenset[Card]) -> tuple[Card, PlayToStack]:
         ...
 
     def pick_up_from(self, can_pick_up_discard: bool, is_discard_card_playable: bool) -> DrawFromStack:
@@ -32,7 +44,7 @@ class Player(ABC):
 
 @dataclass
 class ConsolePlayer(Player):
-    def play_card(self, h: Hand, board_playable_cards: list[Card]) -> tuple[Card, PlayToStack]:
+    def play_card(self, h: Hand, board_playable_cards: frozenset[Card]) -> tuple[Card, PlayToStack]:
         card, exp_or_discard = None, None
         while card is None:
             sel_card = input('Select a card to play: ')
@@ -49,14 +61,141 @@ class ConsolePlayer(Player):
 
 @dataclass
 class BotPlayer(Player):
-    def play_card(self, h: Hand, board_playable_cards: list[Card]) -> tuple[Card, PlayToStack]:
+    pick_up_delay: float = 0.5
+    rng: random.Random = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.rng is None:
+            self.rng = random.Random()
+
+    def choose_move(self, gs: GameState) -> Move:
+        """Same policy as play_card & pick_up_from, drawn from GameState.legal_moves. legal_moves lists a color's
+        handshakes once, so that card is weighted by how many the hand holds & every card in hand stays equally
+        likely, as in play_card"""
+        turn_idx = gs.dealer.player_turn_idx
+        moves = [m for m in gs.legal_moves(turn_idx) if m.draw_from == DrawFromStack.DECK]
+        exp_cards = [m.card for m in moves if m.play_to == PlayToStack.EXPEDITION]
+        play_to = PlayToStack.EXPEDITION if exp_cards else PlayToStack.DISCARD
+        cards = exp_cards or [m.card for m in moves]
+        hand = gs.piles.hands[turn_idx]
+        weights = [sum(1 for h in hand if h.color == c.color and not h.value) if not c.value else 1 for c in cards]
+        card = self.rng.choices(cards, weights)[0]
+        top_card = gs.piles.discard.peek()
+        can_pick_up_discard = play_to == PlayToStack.EXPEDITION and top_card is not None
+        if can_pick_up_discard and top_card.color == card.color and card.value:
+            is_discard_card_playable = top_card.value > card.value
+        else:
+            is_discard_card_playable = can_pick_up_discard and gs.is_card_playable(top_card)
+        return Move(card, play_to, self.pick_up_from(can_pick_up_discard, is_discard_card_playable))
+
+    def play_card(self, h: Hand, board_playable_cards: frozenset[Card]) -> tuple[Card, PlayToStack]:
         playable_cards = [card for card in h.cards if card in board_playable_cards]
         if not playable_cards:
-            return random.choice(h.cards), PlayToStack.DISCARD
-        return random.choice(playable_cards), PlayToStack.EXPEDITION
+            return self.rng.choice(h.cards), PlayToStack.DISCARD
+        return self.rng.choice(playable_cards), PlayToStack.EXPEDITION
 
     def _child_pick_up_from(self, is_discard_card_playable: bool) -> DrawFromStack:
-        time.sleep(0.5)
+        if self.pick_up_delay:
+            time.sleep(self.pick_up_delay)
         if not is_discard_card_playable:
             return DrawFromStack.DECK
-        return DrawFromStack.DECK if random.randint(1, 10) > 8 else DrawFromStack.DISCARD
+        return DrawFromStack.DECK if self.rng.randint(1, 10) > 8 else DrawFromStack.DISCARD
+
+
+@dataclass
+class ISMCTSPlayer(BotPlayer):
+    """Chooses each move by information-set MCTS; see ismcts.py. The search stops at whichever of iterations or
+    time_limit (seconds) is reached first; workers > 1 splits it across processes.
+    Once a two-player round's deck is down to endgame_deck_cnt cards, endgame_samples determinizations are solved
+    exactly instead; see solver.py. The player keeps its EndgameSolver, so its transposition table carries over
+    from turn to turn, but drops it when pickled, e.g. to run a turn in a worker process.
+    With beliefs, a BeliefTracker for this player registered as an engine observer (e.g. from track_beliefs), the
+    cards it saw the others take from the discard stay in their hands in every determinization"""
+    iterations: int | None = 1000
+    time_limit: float | None = None
+    workers: int = 1
+    exploration: float = 0.7
+    endgame_deck_cnt: int = 0
+    endgame_samples: int = 8
+    beliefs: BeliefTracker | None = field(default=None, repr=False, compare=False)
+    _solver: EndgameSolver = field(default=None, init=False, repr=False, compare=False)
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, '_solver': None}
+
+    def choose_move(self, gs: GameState) -> Move:
+        turn_idx = gs.dealer.player_turn_idx
+        known_hands = self.beliefs.known_hands if self.beliefs is not None else None
+        if gs.player_cnt == 2 and len(gs.piles.deck) <= self.endgame_deck_cnt:
+            if self._solver is None:
+                self._solver = EndgameSolver(max_deck_cnt=self.endgame_deck_cnt)
+            return solve_determinized(gs, turn_idx, self.endgame_samples, self.rng, self._solver, known_hands)
+        if self.workers > 1:
+            return parallel_search(gs, turn_idx, self.iterations, self.time_limit, self.workers, self.exploration,
+                                   self.rng.getrandbits(32), known_hands)
+        return ISMCTS(gs, turn_idx, self.exploration, self.rng, known_hands).run(self.iterations, self.time_limit)
+
+
+@dataclass
+class AsyncPlayer(ABC):
+    """A player for AsyncLostCities; the engine awaits a whole turn at a time, so a slow human or network player
+    only holds up its own game"""
+    idx: int
+    name: str
+
+    @abstractmethod
+    async def choose_move(self, gs: GameState) -> Move:
+        ...
+
+
+def _choose_move(player: Player, gs: GameState) -> tuple[Move, Player]:
+    """Runs a synchronous player's whole turn & returns the player too, so its state survives a process boundary"""
+    move = player.choose_move(gs)
+    if move is None:
+        turn_idx = gs.dealer.player_turn_idx
+        card, play_to = player.play_card(gs.piles.hands[turn_idx], gs.board_playable_cards)
+        after_play = gs.clone()
+        after_play.play_card_to(turn_idx, card, play_to)
+        can_pick_up_discard = play_to == PlayToStack.EXPEDITION and len(after_play.piles.discard) > 0
+        move = MOVES[card, play_to, player.pick_up_from(can_pick_up_discard, after_play.is_discard_card_playable)]
+    return move, player
+
+
+@dataclass
+class OffloadedPlayer(AsyncPlayer):
+    """Runs a synchronous Player's turns in an executor, so CPU-bound search or blocking input doesn't stall the
+    event loop. executor defaults to the loop's thread pool; with a ProcessPoolExecutor the player & GameState are
+    shipped to a worker for each turn & the player is shipped back, so its state (e.g. its rng) carries over, though
+    it's no longer shared with anything else. offload=False runs the turn on the loop itself, which is cheaper for
+    bots that decide in microseconds. The wrapped player's pick_up_delay is awaited here instead of slept"""
+    player: Player = None
+    executor: Executor | None = field(default=None, repr=False)
+    pick_up_delay: float = 0
+    offload: bool = True
+
+    @classmethod
+    def from_player(cls, player: Player, executor: Executor | None = None, offload: bool = True) -> "OffloadedPlayer":
+        pick_up_delay = getattr(player, 'pick_up_delay', 0)
+        if pick_up_delay:
+            player.pick_up_delay = 0
+        return cls(player.idx, player.name, player, executor, pick_up_delay, offload)
+
+    async def choose_move(self, gs: GameState) -> Move:
+        if self.offload:
+            loop = asyncio.get_running_loop()
+            move, self.player = await loop.run_in_executor(self.executor, _choose_move, self.player, gs)
+        else:
+            move, _ = _choose_move(self.player, gs)
+        if self.pick_up_delay:
+            await asyncio.sleep(self.pick_up_delay)
+        return move
+
+
+@dataclass
+class QueuePlayer(AsyncPlayer):
+    """A remote player whose moves arrive on a queue, e.g. put there by a network handler.
+    An illegal move is rendered as an error & the player is asked again"""
+    moves: asyncio.Queue = field(default_factory=asyncio.Queue, repr=False)
+
+    async def choose_move(self, gs: GameState) -> Move:
+        return await self.moves.get()
@@ -0,0 +1,196 @@
+"""Streaming game-record files for large simulation corpora.
+A RecordWriter is an EventSink: hand it to a Log (or to simulation.simulate) & each game's events are written as
+they're logged. Two formats are chosen by file suffix:
+    binary (.lcr): a 4-byte magic, then per game a 10-byte start record (tag, seed flag, int64 seed; larger seeds
+        are rejected), one 5-byte record per event (action, player, card idx, destination, source; 255 for None) &
+        a 1-byte end tag
+    JSON lines (.jsonl): one line per game, {"seed": ..., "events": [[action, player, card, dest, source], ...]}
+Adding .gz or .xz compresses either format. Writes are buffered & flushed in buffer_size chunks.
+iter_games reads a file lazily, one GameRecord at a time; uncompressed binary files are memory-mapped."""
+
+import gzip
+import json
+import lzma
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from gamenacki.common.log import Event, EventSink
+from gamenacki.lostcitinacki.models.constants import Action, PlayToStack, DrawFromStack
+
+MAGIC = b'LCR1'
+GAME_START_TAG, GAME_END_TAG = 0xFE, 0xFD
+NONE_CODE = 0xFF
+GAME_START = struct.Struct('<BBq')
+EVENT_SIZE = 5
+
+ACTIONS: list[Action] = list(Action)
+DESTS: list[PlayToStack] = list(PlayToStack)
+SOURCES: list[DrawFromStack] = list(DrawFromStack)
+
+
+@dataclass(frozen=True, slots=True)
+class GameRecord:
+    seed: int | None
+    events: tuple[Event, ...]
+
+
+def _code(value, members: list) -> int:
+    return NONE_CODE if value is None else members.index(value)
+
+
+def encode_event(event: Event) -> bytes:
+    return bytes((ACTIONS.index(event.action),
+                  NONE_CODE if event.player_idx is None else event.player_idx,
+                  NONE_CODE if event.card_idx is None else event.card_idx,
+                  _code(event.dest, DESTS), _code(event.source, SOURCES)))
+
+
+def decode_event(record: bytes) -> Event:
+    action, player_idx, card_idx, dest, source = record
+    return Event(ACTIONS[action], None if player_idx == NONE_CODE else player_idx,
+                 None if card_idx == NONE_CODE else card_idx,
+                 None if dest == NONE_CODE else DESTS[dest], None if source == NONE_CODE else SOURCES[source])
+
+
+def _open(path: Path, mode: str) -> BinaryIO:
+    if path.suffix == '.gz':
+        return gzip.open(path, mode)
+    if path.suffix == '.xz':
+        return lzma.open(path, mode)
+    return open(path, mode)
+
+
+def _format(path: Path) -> str:
+    suffixes = [s for s in path.suffixes if s not in ('.gz', '.xz')]
+    if not suffixes or suffixes[-1] not in ('.lcr', '.jsonl'):
+        raise ValueError(f"{path} must end in .lcr or .jsonl, optionally followed by .gz or .xz")
+    return suffixes[-1]
+
+
+class RecordWriter(EventSink):
+    """Use as a context manager, or call close() once every game has ended"""
+    def __init__(self, path: str | Path, buffer_size: int = 1 << 16):
+        self.path = Path(path)
+        self.is_binary = _format(self.path) == '.lcr'
+        self.buffer_size = buffer_size
+        self.game_cnt = 0
+        self._file = _open(self.path, 'wb')
+        self._buffer = bytearray(MAGIC if self.is_binary else b'')
+        self._encoded: dict[Event, bytes] = {}
+        self._seed: int | None = None
+        self._game_events: list[list] = []
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def begin_game(self, seed: int | None) -> None:
+        """Raises ValueError for a binary file when seed doesn't fit in an int64"""
+        if self.is_binary:
+            if seed is not None and not -1 << 63 <= seed < 1 << 63:
+                raise ValueError(f"Binary records store seeds as int64; {seed} is out of range")
+            self._buffer += GAME_START.pack(GAME_START_TAG, seed is not None, seed or 0)
+        else:
+            self._seed, self._game_events = seed, []
+
+    def write_event(self, event: Event) -> None:
+        if self.is_binary:
+            encoded = self._encoded.get(event)
+            if encoded is None:
+                encoded = self._encoded[event] = encode_event(event)
+            self._buffer += encoded
+        else:
+            self._game_events.append([event.action.value, event.player_idx, event.card_idx, event.dest, event.source])
+
+    def end_game(self) -> None:
+        if self.is_binary:
+            self._buffer.append(GAME_END_TAG)
+        else:
+            self._buffer += json.dumps({'seed': self._seed, 'events': self._game_events}).encode() + b'\n'
+            self._game_events = []
+        self.game_cnt += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def _iter_binary_games(data, pos: int, decoded: dict[bytes, Event]) -> Iterator[tuple[GameRecord, int]]:
+    """Yields each complete game in data from pos on, with the position just past it"""
+    end = len(data)
+    while pos + GAME_START.size < end:
+        tag, has_seed, seed = GAME_START.unpack_from(data, pos)
+        if tag != GAME_START_TAG:
+            raise ValueError(f"Corrupt game record at byte {pos}")
+        event_pos, events = pos + GAME_START.size, []
+        while event_pos < end and data[event_pos] != GAME_END_TAG:
+            if event_pos + EVENT_SIZE > end:
+                return
+            record = bytes(data[event_pos:event_pos + EVENT_SIZE])
+            event = decoded.get(record)
+            if event is None:
+                event = decoded[record] = decode_event(record)
+            events.append(event)
+            event_pos += EVENT_SIZE
+        if event_pos >= end:
+            return
+        pos = event_pos + 1
+        yield GameRecord(seed if has_seed else None, tuple(events)), pos
+
+
+def _check_magic(data) -> None:
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a game record file")
+
+
+def _iter_binary_stream(f: BinaryIO, chunk_size: int = 1 << 20) -> Iterator[GameRecord]:
+    data, decoded = bytearray(f.read(len(MAGIC))), {}
+    _check_magic(data)
+    del data[:]
+    while chunk := f.read(chunk_size):
+        data += chunk
+        pos = 0
+        for game, pos in _iter_binary_games(data, 0, decoded):
+            yield game
+        del data[:pos]
+    if data:
+        raise ValueError("The record file ends partway through a game")
+
+
+def _iter_jsonl_games(lines) -> Iterator[GameRecord]:
+    for line in lines:
+        game = json.loads(line)
+        yield GameRecord(game['seed'], tuple(Event(Action(e[0]), e[1], e[2], e[3] and PlayToStack(e[3]),
+                                                   e[4] and DrawFromStack(e[4])) for e in game['events']))
+
+
+def iter_games(path: str | Path) -> Iterator[GameRecord]:
+    """Lazily yields every game in a record file written by RecordWriter"""
+    path = Path(path)
+    is_binary = _format(path) == '.lcr'
+    if is_binary and path.suffix == '.lcr':
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            _check_magic(data)
+            pos = len(MAGIC)
+            for game, pos in _iter_binary_games(data, pos, {}):
+                yield game
+            if pos != len(data):
+                raise ValueError("The record file ends partway through a game")
+    elif is_binary:
+        with _open(path, 'rb') as f:
+            yield from _iter_binary_stream(f)
+    else:
+        with _open(path, 'rb') as f:
+            yield from _iter_jsonl_games(f)
@@ -1,8 +1,8 @@
 import time
 
 from gamenacki.common.log import Log
-from gamenacki.common.base_renderer import Renderer
-from gamenacki.lostcitinacki.players import Player
+from gamenacki.common.base_renderer import AsyncRenderer, Renderer
+from gamenacki.lostcitinacki.players import AsyncPlayer, Player
 from gamenacki.lostcitinacki.models.game_state import GameState
 
 
@@ -46,3 +46,39 @@ class ConsoleRenderer(Renderer):
     def render_log(self, game_log: Log) -> None:
         for event in game_log:
             print(event)
+
+
+class NullRenderer(Renderer):
+    """Renders nothing; used for headless bot-vs-bot simulation"""
+    def render(self, gs: GameState, players: list[Player]) -> None:
+        pass
+
+    def render_error(self, exc: Exception) -> None:
+        pass
+
+    def render_log(self, game_log: Log) -> None:
+        pass
+
+
+class RecordingRenderer(NullRenderer):
+    """Renders nothing but keeps the errors raised during play, so headless callers can still inspect them"""
+    def __init__(self):
+        self.errors: list[Exception] = []
+
+    def render_error(self, exc: Exception) -> None:
+        self.errors.append(exc)
+
+
+class AsyncRendererAdapter(AsyncRenderer):
+    """Drives a synchronous Renderer from an AsyncLostCities game; fine for renderers that don't block"""
+    def __init__(self, renderer: Renderer):
+        self.renderer = renderer
+
+    async def render(self, gs: GameState, players: list[AsyncPlayer]) -> None:
+        self.renderer.render(gs, players)
+
+    async def render_error(self, exc: Exception) -> None:
+        self.renderer.render_error(exc)
+
+    async def render_log(self, game_log: Log) -> None:
+        self.renderer.render_log(game_log)
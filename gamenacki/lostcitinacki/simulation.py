@@ -0,0 +1,89 @@
+"""Headless batch simulation of LostCities games, e.g. for pitting bots against each other.
+Games are run without rendering or pacing delays and only a compact GameResult is kept per game.
+Each game gets its own random.Random(seed + game_idx), shared by the GameState & the players, so results are
+reproducible game by game regardless of how games are ordered or split across processes."""
+
+import random
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from gamenacki.common.log import EventSink, Log
+from gamenacki.lostcitinacki.engine import LostCities
+from gamenacki.lostcitinacki.metrics import EngineMetrics
+from gamenacki.lostcitinacki.models.constants import Action
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.players import Player
+from gamenacki.lostcitinacki.records import RecordWriter
+from gamenacki.lostcitinacki.renderers import RecordingRenderer
+
+PlayersFactory = Callable[[random.Random], list[Player]]
+
+
+@dataclass(frozen=True, slots=True)
+class GameResult:
+    game_idx: int
+    seed: int
+    points: tuple[int, ...]
+    winners: tuple[int, ...]
+    turns: int
+    error_cnt: int
+
+
+def play_headless_game(players: list[Player], max_rounds: int = 3, rng: random.Random | None = None,
+                       seed: int | None = None, sink: EventSink | None = None,
+                       metrics: EngineMetrics | None = None, game: LostCities | None = None) -> LostCities:
+    """Plays one game to completion with no rendering & no delays, then returns the finished engine; players
+    must be built without pacing delays (e.g. BotPlayer(..., pick_up_delay=0)), else ValueError is raised;
+    seed is only recorded in the log, rng is what drives the game. Events are also streamed to sink, if given,
+    & the game's timers & counters are added to metrics, if given.
+    Passing a finished engine from an earlier call plays the game on it (see LostCities.new_game) instead of
+    building a new one; that engine's results must have been read already"""
+    paced = [p.name for p in players if getattr(p, 'pick_up_delay', 0)]
+    if paced:
+        raise ValueError(f"Headless games can't pause for players; build {', '.join(paced)} with pick_up_delay=0")
+    if game is None:
+        gs = GameState.create_game_state(len(players), max_rounds, rng)
+        game = LostCities(players, RecordingRenderer(), gs, Log(sink=sink), max_rounds=max_rounds, round_end_delay=0,
+                          seed=seed, metrics=metrics)
+    else:
+        game.renderer.errors.clear()
+        game.metrics = metrics
+        game.new_game(players, rng, seed, Log(sink=sink))
+    game.play()
+    return game
+
+
+def _game_result(game_idx: int, game: LostCities) -> GameResult:
+    winner = game.gs.winner
+    winners = (winner[0],) if isinstance(winner, tuple) else tuple(w[0] for w in winner)
+    return GameResult(game_idx=game_idx, seed=game.seed,
+                      points=tuple(ledger.total for ledger in game.gs.scorer.ledgers), winners=winners,
+                      turns=sum(1 for e in game.log if e.action == Action.PLAY_CARD),
+                      error_cnt=len(game.renderer.errors))
+
+
+def simulate_game(game_idx: int, players_factory: PlayersFactory, seed: int, max_rounds: int = 3,
+                  sink: EventSink | None = None, metrics: EngineMetrics | None = None) -> GameResult:
+    game_seed = seed + game_idx
+    rng = random.Random(game_seed)
+    return _game_result(game_idx, play_headless_game(players_factory(rng), max_rounds, rng, game_seed, sink, metrics))
+
+
+def simulate(n_games: int, players_factory: PlayersFactory, seed: int = 0, max_rounds: int = 3,
+             record_path: str | Path | None = None, metrics: EngineMetrics | None = None) -> list[GameResult]:
+    """Plays n_games headless games; game i is seeded with seed + i so any single game can be re-run alone.
+    players_factory is called once per game with that game's rng & must return fresh Player objects,
+    ex: lambda rng: [BotPlayer(0, 'A', pick_up_delay=0, rng=rng), BotPlayer(1, 'B', pick_up_delay=0, rng=rng)]
+    With record_path, every game's events are streamed to that record file; see records.py.
+    With metrics, every game's timers & counters accumulate into it; see metrics.py.
+    One engine & GameState are reused for every game, their piles reset in place between games"""
+    with RecordWriter(record_path) if record_path is not None else nullcontext() as writer:
+        game, results = None, []
+        for i in range(n_games):
+            game_seed = seed + i
+            rng = random.Random(game_seed)
+            game = play_headless_game(players_factory(rng), max_rounds, rng, game_seed, writer, metrics, game)
+            results.append(_game_result(i, game))
+        return results
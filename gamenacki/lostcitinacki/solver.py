@@ -0,0 +1,257 @@
+"""Exact endgame solver for two-player rounds.
+Near a round's end the tree is small enough to search completely. EndgameSolver runs negamax with alpha-beta over
+the perfect-information position (every hand & the deck order known), on int bitmasks as in bitboard.py, and
+caches bounds in a transposition table keyed by the Zobrist hash of the position.
+A position's value is the round's final board points of the player to move minus their opponent's
+(ExpeditionBoard.points), so the best move maximizes the mover's margin.
+
+Post-game analysis can solve the true position; a bot, which can't see the other hand or the deck, can solve
+several determinizations of it & vote (see solve_determinized)."""
+
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+
+from gamenacki.lostcitinacki.ismcts import determinize
+from gamenacki.lostcitinacki.models.bitboard import (BitState, CHUNK_MAX_VALUE, CHUNK_PLAYABLE, CHUNK_POINTS,
+                                                     COLOR_CHUNK, COLORS, TEN_MASK)
+from gamenacki.lostcitinacki.models.cards import CARDS, CARDS_PER_COLOR, HANDSHAKES_PER_COLOR
+from gamenacki.lostcitinacki.models.constants import DrawFromStack, PlayToStack
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.moves import Move, MOVES
+from gamenacki.lostcitinacki.models.zobrist import BOARD_KEYS, DECK_KEYS, DISCARD_KEYS, HAND_KEYS, TURN_KEYS
+
+EXACT, LOWER, UPPER = 0, 1, 2
+SHIFTS = tuple(color_i * CARDS_PER_COLOR for color_i in range(len(COLORS)))
+
+# A solver move: (card idx, played to an expedition?, drawn from the discard?)
+SolverMove = tuple[int, bool, bool]
+
+
+def _canonical_chunk(chunk: int) -> int:
+    """chunk with all but its lowest handshake cleared; a color's handshakes are interchangeable"""
+    handshakes = chunk & (1 << HANDSHAKES_PER_COLOR) - 1
+    return chunk ^ handshakes ^ (handshakes & -handshakes)
+
+
+CANONICAL_CHUNK: tuple[int, ...] = tuple(_canonical_chunk(m) for m in range(1 << CARDS_PER_COLOR))
+
+
+def _bits(mask: int) -> list[int]:
+    idxs = []
+    while mask:
+        low_bit = mask & -mask
+        idxs.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return idxs
+
+
+def _to_move(m: SolverMove) -> Move:
+    card_idx, to_expedition, from_discard = m
+    return MOVES[CARDS[card_idx], PlayToStack.EXPEDITION if to_expedition else PlayToStack.DISCARD,
+                 DrawFromStack.DISCARD if from_discard else DrawFromStack.DECK]
+
+
+@dataclass(frozen=True, slots=True)
+class Solution:
+    move: Move
+    value: int
+    node_cnt: int
+
+
+@dataclass
+class EndgameSolver:
+    """Reusable across positions; the transposition table (& the move & board point caches with it) is cleared once
+    it holds max_table_size entries. max_deck_cnt guards against positions too early in the round to solve in
+    reasonable time"""
+    max_deck_cnt: int = 8
+    max_table_size: int = 1 << 21
+    node_cnt: int = field(default=0, init=False)
+    _table: dict[int, tuple[int, int, SolverMove | None]] = field(default_factory=dict, init=False, repr=False)
+    _moves: dict[tuple[int, int, bool], list[SolverMove]] = field(default_factory=dict, init=False, repr=False)
+    _points: dict[int, int] = field(default_factory=dict, init=False, repr=False)
+
+    def solve(self, gs: GameState) -> Solution | None:
+        """The best move for the player to move & its value; None once the round is over"""
+        values = self._search_root(gs, every_move=False)
+        if not values:
+            return None
+        m, value = values[0]
+        return Solution(_to_move(m), value, self.node_cnt)
+
+    def evaluate_moves(self, gs: GameState) -> dict[Move, int]:
+        """The exact value of every legal move (handshakes of a color counted once), best first; for analysis"""
+        return {_to_move(m): value for m, value in self._search_root(gs, every_move=True)}
+
+    def _search_root(self, gs: GameState, every_move: bool) -> list[tuple[SolverMove, int]]:
+        if gs.player_cnt != 2:
+            raise ValueError("The endgame solver only handles two players")
+        if len(gs.piles.deck) > self.max_deck_cnt:
+            raise ValueError(f"{len(gs.piles.deck)} deck cards is more than max_deck_cnt ({self.max_deck_cnt})")
+        if gs.is_round_over:
+            return []
+        self._load(BitState.from_game_state(gs))
+        self.node_cnt = 0
+        if len(self._table) >= self.max_table_size:
+            self._table.clear()
+            self._moves.clear()
+            self._points.clear()
+        values = []
+        alpha = -10_000
+        for m in self._ordered_moves():
+            value = self._move_value(m, alpha, 10_000)
+            values.append((m, value))
+            if not every_move:
+                alpha = max(alpha, value)
+        values.sort(key=lambda t: t[1], reverse=True)
+        return values
+
+    def _load(self, bs: BitState) -> None:
+        self.hands, self.boards, self.turn = bs.hands.copy(), bs.boards.copy(), bs.player_turn_idx
+        self.deck, self.discard = bs.deck.copy(), bs.discard.copy()
+        self.deck_len = len(self.deck)
+        h = TURN_KEYS[self.turn]
+        for p_idx in range(2):
+            for c in _bits(self.hands[p_idx]):
+                h ^= HAND_KEYS[p_idx][c]
+            for c in _bits(self.boards[p_idx]):
+                h ^= BOARD_KEYS[p_idx][c]
+        for pos, c in enumerate(self.deck):
+            h ^= DECK_KEYS[pos][c]
+        for pos, c in enumerate(self.discard):
+            h ^= DISCARD_KEYS[pos][c]
+        self.hash = h
+
+    def _ordered_moves(self, hint: SolverMove | None = None) -> list[SolverMove]:
+        """Expedition plays drawing from the deck, then discards, then expedition plays drawing from the discard;
+        hint, if legal, goes first. Move lists are cached by hand, boards & whether the discard has cards"""
+        hand, all_boards = self.hands[self.turn], self.boards[0] | self.boards[1]
+        key = (hand, all_boards, bool(self.discard))
+        moves = self._moves.get(key)
+        if moves is None:
+            moves = self._moves[key] = self._generate_moves(*key)
+        if hint is not None and hint != moves[0] and hint in moves:
+            moves = moves.copy()
+            moves.remove(hint)
+            moves.insert(0, hint)
+        return moves
+
+    @staticmethod
+    def _generate_moves(hand: int, all_boards: int, can_draw_discard: bool) -> list[SolverMove]:
+        canonical_hand = playable = 0
+        for shift in SHIFTS:
+            canonical_hand |= CANONICAL_CHUNK[hand >> shift & COLOR_CHUNK] << shift
+            playable |= CHUNK_PLAYABLE[CHUNK_MAX_VALUE[all_boards >> shift & COLOR_CHUNK]] << shift
+        plays, discards, discard_draws = [], [], []
+        for c in _bits(canonical_hand):
+            if playable >> c & 1:
+                plays.append((c, True, False))
+                if can_draw_discard:
+                    discard_draws.append((c, True, True))
+            discards.append((c, False, False))
+        return plays + discards + discard_draws
+
+    def _make(self, m: SolverMove) -> int:
+        """Plays m for the player to move & returns the idx of the card drawn"""
+        c, to_expedition, from_discard = m
+        turn = self.turn
+        h = self.hash ^ HAND_KEYS[turn][c]
+        self.hands[turn] ^= 1 << c
+        if to_expedition:
+            self.boards[turn] |= 1 << c
+            h ^= BOARD_KEYS[turn][c]
+        else:
+            h ^= DISCARD_KEYS[len(self.discard)][c]
+            self.discard.append(c)
+        if from_discard:
+            drawn = self.discard.pop()
+            h ^= DISCARD_KEYS[len(self.discard)][drawn]
+        else:
+            self.deck_len -= 1
+            drawn = self.deck[self.deck_len]
+            h ^= DECK_KEYS[self.deck_len][drawn]
+        self.hands[turn] |= 1 << drawn
+        self.turn = 1 - turn
+        self.hash = h ^ HAND_KEYS[turn][drawn] ^ TURN_KEYS[turn] ^ TURN_KEYS[1 - turn]
+        return drawn
+
+    def _unmake(self, m: SolverMove, drawn: int) -> None:
+        c, to_expedition, from_discard = m
+        turn = self.turn = 1 - self.turn
+        h = self.hash ^ HAND_KEYS[turn][drawn] ^ TURN_KEYS[turn] ^ TURN_KEYS[1 - turn]
+        self.hands[turn] ^= 1 << drawn
+        if from_discard:
+            h ^= DISCARD_KEYS[len(self.discard)][drawn]
+            self.discard.append(drawn)
+        else:
+            h ^= DECK_KEYS[self.deck_len][drawn]
+            self.deck_len += 1
+        if to_expedition:
+            self.boards[turn] ^= 1 << c
+            h ^= BOARD_KEYS[turn][c]
+        else:
+            self.discard.pop()
+            h ^= DISCARD_KEYS[len(self.discard)][c]
+        self.hands[turn] |= 1 << c
+        self.hash = h ^ HAND_KEYS[turn][c]
+
+    def _board_points(self, board: int) -> int:
+        points = self._points.get(board)
+        if points is None:
+            points = self._points[board] = sum(CHUNK_POINTS[board >> shift & COLOR_CHUNK] for shift in SHIFTS)
+        return points
+
+    def _move_value(self, m: SolverMove, alpha: int, beta: int) -> int:
+        """m's value to the player making it; a move that ends the round is scored without being played"""
+        c, to_expedition, from_discard = m
+        board, other_board = self.boards[self.turn], self.boards[1 - self.turn]
+        if to_expedition:
+            board |= 1 << c
+        if not from_discard and self.deck_len == 1 or (board | other_board) & TEN_MASK == TEN_MASK:
+            return self._board_points(board) - self._board_points(other_board)
+        drawn = self._make(m)
+        value = -self._negamax(-beta, -alpha)
+        self._unmake(m, drawn)
+        return value
+
+    def _negamax(self, alpha: int, beta: int) -> int:
+        """The value of the (not yet over) position to the player to move, within the alpha-beta window"""
+        self.node_cnt += 1
+        entry = self._table.get(self.hash)
+        hint = None
+        if entry is not None:
+            value, flag, hint = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER and value >= beta or flag == UPPER and value <= alpha:
+                return value
+        alpha_in, best, best_move = alpha, -10_000, None
+        for m in self._ordered_moves(hint):
+            value = self._move_value(m, alpha, beta)
+            if value > best:
+                best, best_move = value, m
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        flag = UPPER if best <= alpha_in else LOWER if best >= beta else EXACT
+        self._table[self.hash] = (best, flag, best_move)
+        return best
+
+
+def solve_determinized(gs: GameState, observer_idx: int, samples: int = 8, rng: random.Random | None = None,
+                       solver: EndgameSolver | None = None, known_hands: list[int] | None = None) -> Move | None:
+    """For a player who can't see the other hand or the deck: solves samples random determinizations of gs &
+    returns the move that's best in the most of them (ties go to the higher summed value).
+    The observer's hand is the same in every determinization, so their moves are too; known_hands is as for
+    ismcts.determinize"""
+    rng = rng or random.Random()
+    solver = solver or EndgameSolver()
+    votes, value_totals = Counter(), Counter()
+    for _ in range(samples):
+        solution = solver.solve(determinize(gs, observer_idx, rng, known_hands))
+        if solution is None:
+            return None
+        votes[solution.move] += 1
+        value_totals[solution.move] += solution.value
+    return max(votes, key=lambda m: (votes[m], value_totals[m]))
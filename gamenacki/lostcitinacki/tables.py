@@ -0,0 +1,225 @@
+"""Hosting many LostCities games at once: a TableManager creates tables, routes each move to its table & enforces
+turn order by Dealer.player_turn_idx.
+At most max_resident tables are kept in memory; the least recently used table beyond that is evicted to a compact
+snapshot file in snapshot_dir (its BitState bytes, its rng state & player names; ~2.6 KB) & restored transparently
+when it's next touched, so memory stays bounded however many tables are open. A restored table's hands come back
+ordered by card, as with any BitState round trip.
+
+TableManager.handle is the whole client protocol: it takes & returns JSON-able dicts, so the same requests work
+in-process (TableClient) or over a local socket (serve_tables speaks one JSON object per line), e.g.
+    {"op": "create", "players": ["Ann", "Bob"], "seed": 7}  -> {"table_id": "...", "view": {...}}
+    {"op": "move", "table_id": "...", "player_idx": 0, "card_idx": 12, "play_to": "expedition", "draw_from": "deck"}
+    {"op": "view", "table_id": "...", "player_idx": 0}
+    {"op": "close", "table_id": "..."}
+Failures come back as {"error": "..."}."""
+
+import asyncio
+import json
+import random
+import struct
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from gamenacki.lostcitinacki.models.bitboard import BitState
+from gamenacki.lostcitinacki.models.cards import CARDS
+from gamenacki.lostcitinacki.models.constants import DrawFromStack, PlayToStack
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.moves import Move, MOVES
+
+SNAPSHOT_SUFFIX = '.table'
+SNAPSHOT_HEADER = struct.Struct('<HH')  # names & BitState byte lengths
+NAME_LEN = struct.Struct('<H')  # each name's byte length, ahead of it
+RNG_STATE = struct.Struct('<I625IBd')  # random.Random.getstate(): version, Mersenne Twister words, gauss_next
+
+
+@dataclass
+class Table:
+    table_id: str
+    player_names: list[str]
+    gs: GameState
+
+    def to_bytes(self) -> bytes:
+        names = b''.join(NAME_LEN.pack(len(name)) + name for name in (n.encode() for n in self.player_names))
+        state = BitState.from_game_state(self.gs).to_bytes()
+        version, words, gauss_next = self.gs.dealer.rng.getstate()
+        rng_state = RNG_STATE.pack(version, *words, gauss_next is not None, gauss_next or 0.0)
+        return SNAPSHOT_HEADER.pack(len(names), len(state)) + names + state + rng_state
+
+    @classmethod
+    def from_bytes(cls, table_id: str, packed: bytes) -> "Table":
+        names_len, state_len = SNAPSHOT_HEADER.unpack_from(packed)
+        pos = SNAPSHOT_HEADER.size
+        names, names_end = [], pos + names_len
+        while pos < names_end:
+            (name_len,), pos = NAME_LEN.unpack_from(packed, pos), pos + NAME_LEN.size
+            names.append(packed[pos:pos + name_len].decode())
+            pos += name_len
+        rng = random.Random()
+        gs = BitState.from_bytes(packed[pos:pos + state_len]).to_game_state(rng)
+        version, *words, has_gauss_next, gauss_next = RNG_STATE.unpack_from(packed, pos + state_len)
+        rng.setstate((version, tuple(words), gauss_next if has_gauss_next else None))
+        return cls(table_id, names, gs)
+
+    def check_player_idx(self, player_idx: int) -> None:
+        if not 0 <= player_idx < len(self.player_names):
+            raise ValueError(f"There is no player {player_idx} at this table")
+
+    def view(self, player_idx: int) -> dict:
+        """What player_idx may see: their own hand, every board, the top discard & the deck size"""
+        self.check_player_idx(player_idx)
+        gs = self.gs
+        top_discard = gs.piles.discard.peek()
+        return {'table_id': self.table_id, 'players': self.player_names, 'player_idx': player_idx,
+                'turn_idx': gs.dealer.player_turn_idx, 'round': gs.dealer.current_round_number,
+                'max_rounds': gs.max_rounds, 'is_game_over': gs.is_game_over,
+                'hand': [[c.idx, repr(c)] for c in gs.piles.hands[player_idx]],
+                'boards': [[[c.idx, repr(c)] for exp in board for c in exp] for board in gs.piles.exp_boards],
+                'top_discard': [top_discard.idx, repr(top_discard)] if top_discard else None,
+                'deck_size': len(gs.piles.deck), 'scores': [ledger.total for ledger in gs.scorer.ledgers]}
+
+
+@dataclass
+class TableManager:
+    snapshot_dir: Path
+    max_resident: int = 1000
+    max_rounds: int = 3
+    _tables: OrderedDict[str, Table] = field(default_factory=OrderedDict, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.max_resident < 1:
+            raise ValueError("max_resident must be at least 1, so the table being played stays in memory")
+        self.snapshot_dir = Path(self.snapshot_dir)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def resident_cnt(self) -> int:
+        return len(self._tables)
+
+    def create_table(self, player_names: list[str], seed: int | None = None) -> Table:
+        """Raises ValueError for names that wouldn't fit the snapshot's length fields"""
+        if not all(isinstance(name, str) for name in player_names):
+            raise ValueError("Player names must be strings")
+        names_len = sum(NAME_LEN.size + len(name.encode()) for name in player_names)
+        if names_len > 0xFFFF:
+            raise ValueError(f"Player names take {names_len} bytes; at most {0xFFFF} fit in a table snapshot")
+        gs = GameState.create_game_state(len(player_names), self.max_rounds, random.Random(seed))
+        table = Table(uuid.uuid4().hex, list(player_names), gs)
+        self._tables[table.table_id] = table
+        self._evict()
+        return table
+
+    def get_table(self, table_id: str) -> Table:
+        """The table, restored from its snapshot if it was evicted; raises KeyError for unknown tables"""
+        table = self._tables.get(table_id)
+        if table is not None:
+            self._tables.move_to_end(table_id)
+            return table
+        path = self._snapshot_path(table_id)
+        if not path.exists():
+            raise KeyError(f"There is no table {table_id}")
+        table = Table.from_bytes(table_id, path.read_bytes())
+        path.unlink()
+        self._tables[table_id] = table
+        self._evict()
+        return table
+
+    def play_move(self, table_id: str, player_idx: int, move: Move) -> Table:
+        """Plays player_idx's whole turn, scoring the round & dealing the next one when the round ends"""
+        table = self.get_table(table_id)
+        table.check_player_idx(player_idx)
+        gs = table.gs
+        if gs.is_game_over:
+            raise ValueError("This game is over")
+        if player_idx != gs.dealer.player_turn_idx:
+            raise ValueError(f"It's {table.player_names[gs.dealer.player_turn_idx]}'s turn")
+        if not gs.is_legal_move(player_idx, move):
+            raise ValueError(f"{move} is not a legal move")
+        gs.play_card_to(player_idx, move.card, move.play_to)
+        gs.draw_from(player_idx, move.draw_from)
+        if gs.is_round_over:
+            gs.assign_points()
+            if not gs.is_game_over:
+                gs.create_new_round()
+        return table
+
+    def close_table(self, table_id: str) -> None:
+        if self._tables.pop(table_id, None) is None:
+            path = self._snapshot_path(table_id)
+            if not path.exists():
+                raise KeyError(f"There is no table {table_id}")
+            path.unlink()
+
+    def evict_all(self) -> None:
+        """Writes every resident table to disk, e.g. before shutting down"""
+        while self._tables:
+            self._evict_oldest()
+
+    def handle(self, request: dict) -> dict:
+        try:
+            op = request['op']
+            if op == 'create':
+                table = self.create_table(request['players'], request.get('seed'))
+                return {'table_id': table.table_id, 'view': table.view(0)}
+            if op == 'move':
+                if not 0 <= request['card_idx'] < len(CARDS):
+                    raise ValueError(f"There is no card {request['card_idx']}")
+                move = MOVES[CARDS[request['card_idx']], PlayToStack(request['play_to']),
+                             DrawFromStack(request['draw_from'])]
+                return {'view': self.play_move(request['table_id'], request['player_idx'], move)
+                        .view(request['player_idx'])}
+            if op == 'view':
+                return {'view': self.get_table(request['table_id']).view(request['player_idx'])}
+            if op == 'close':
+                self.close_table(request['table_id'])
+                return {'closed': request['table_id']}
+            raise ValueError(f"Unknown op {op!r}")
+        except (KeyError, IndexError, ValueError, TypeError) as ex:
+            return {'error': str(ex.args[0]) if ex.args else repr(ex)}
+
+    def _snapshot_path(self, table_id: str) -> Path:
+        if not table_id.isalnum():
+            raise KeyError(f"There is no table {table_id}")
+        return self.snapshot_dir / f'{table_id}{SNAPSHOT_SUFFIX}'
+
+    def _write_snapshot(self, table: Table) -> None:
+        path = self._snapshot_path(table.table_id)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(table.to_bytes())
+        tmp_path.replace(path)
+
+    def _evict(self) -> None:
+        while len(self._tables) > self.max_resident:
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """Snapshots the least recently used table, dropping it from memory only once it's on disk"""
+        self._write_snapshot(next(iter(self._tables.values())))
+        self._tables.popitem(last=False)
+
+
+@dataclass
+class TableClient:
+    """An in-process stand-in for a socket client, speaking the same request dicts"""
+    manager: TableManager
+
+    def request(self, **request) -> dict:
+        return self.manager.handle(request)
+
+
+async def serve_tables(manager: TableManager, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+    """Serves manager.handle over TCP, one JSON request & one JSON response per line; port 0 picks a free port"""
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = manager.handle(json.loads(line))
+                except json.JSONDecodeError as ex:
+                    response = {'error': f"Malformed request: {ex}"}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle_connection, host, port)
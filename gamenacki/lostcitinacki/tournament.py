@@ -0,0 +1,236 @@
+"""Tournaments between Player strategies: round-robin or Swiss pairings, played headlessly across a process pool.
+An Entrant is a name & a picklable factory called as factory(idx, name, rng=rng), e.g.
+functools.partial(BotPlayer, pick_up_delay=0) or a module-level function; games are headless, so players must be
+built without pacing delays.
+
+Each pairing's games come in seat-swapped pairs on the same seed: game k is seeded with seed + k // 2 and the
+pairing's first entrant takes the first seat in even games, the second seat in odd ones. Each player gets its own
+rng, seeded from the game's before the first deal, so the game's rng only shuffles & deals: every pairing plays the
+same deals in every round, whatever its players do, so differences between pairings aren't down to the cards.
+Games are handed to workers in batches of batch_size. As results stream back they update the pairing's stats &
+both entrants' Glicko ratings. A pairing stops early once it's settled: after min_games, when its mean score is
+z_stop standard errors from a draw. z_stop is set well above 1.96 because the test is repeated after every batch.
+Ratings are updated in arrival order, so they can vary slightly between runs; pairing stats don't."""
+
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+
+from gamenacki.lostcitinacki.players import Player
+from gamenacki.lostcitinacki.simulation import simulate_game
+
+PlayerFactory = Callable[..., Player]
+
+GLICKO_Q = math.log(10) / 400
+
+
+@dataclass(frozen=True)
+class Entrant:
+    name: str
+    factory: PlayerFactory
+
+
+@dataclass
+class Rating:
+    """A Glicko-1 rating, updated one game at a time; interval is rating ± z rating deviations"""
+    rating: float = 1500.0
+    rd: float = 350.0
+    game_cnt: int = 0
+
+    @staticmethod
+    def _g(rd: float) -> float:
+        return 1 / math.sqrt(1 + 3 * GLICKO_Q ** 2 * rd ** 2 / math.pi ** 2)
+
+    def expected_score(self, opponent: "Rating") -> float:
+        return 1 / (1 + 10 ** (-self._g(opponent.rd) * (self.rating - opponent.rating) / 400))
+
+    def updated(self, opponent: "Rating", score: float) -> "Rating":
+        """This rating after one game against opponent, scoring 1 for a win, 0.5 for a tie & 0 for a loss"""
+        g, expected = self._g(opponent.rd), self.expected_score(opponent)
+        d_squared_inv = GLICKO_Q ** 2 * g ** 2 * expected * (1 - expected)
+        precision = 1 / self.rd ** 2 + d_squared_inv
+        return Rating(self.rating + GLICKO_Q / precision * g * (score - expected), math.sqrt(1 / precision),
+                      self.game_cnt + 1)
+
+    def interval(self, z: float = 1.96) -> tuple[float, float]:
+        return self.rating - z * self.rd, self.rating + z * self.rd
+
+
+@dataclass
+class PairingStats:
+    """Results of a's games against b, scored from a's side"""
+    a: int
+    b: int
+    game_cnt: int = 0
+    a_win_cnt: int = 0
+    b_win_cnt: int = 0
+    tie_cnt: int = 0
+    is_settled: bool = False
+    _score_sum: float = field(default=0.0, repr=False)
+    _score_sq_sum: float = field(default=0.0, repr=False)
+
+    def add(self, a_score: float) -> None:
+        self.game_cnt += 1
+        self._score_sum += a_score
+        self._score_sq_sum += a_score * a_score
+        if a_score == 1:
+            self.a_win_cnt += 1
+        elif a_score == 0:
+            self.b_win_cnt += 1
+        else:
+            self.tie_cnt += 1
+
+    @property
+    def mean_score(self) -> float:
+        return self._score_sum / self.game_cnt if self.game_cnt else 0.5
+
+    @property
+    def std_error(self) -> float:
+        if self.game_cnt < 2:
+            return math.inf
+        variance = (self._score_sq_sum - self.game_cnt * self.mean_score ** 2) / (self.game_cnt - 1)
+        return math.sqrt(max(variance, 0.0) / self.game_cnt)
+
+    @property
+    def z_score(self) -> float:
+        """How many standard errors a's mean score is from a draw; 0 while there's no spread to measure"""
+        std_error = self.std_error
+        if std_error == 0.0:
+            return math.copysign(math.inf, self.mean_score - 0.5) if self.mean_score != 0.5 else 0.0
+        return (self.mean_score - 0.5) / std_error if std_error != math.inf else 0.0
+
+    @staticmethod
+    def _elo(score: float) -> float:
+        score = min(max(score, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / score - 1)
+
+    @property
+    def elo_diff(self) -> float:
+        """a's Elo advantage over b implied by a's mean score"""
+        return self._elo(self.mean_score)
+
+    def elo_interval(self, z: float = 1.96) -> tuple[float, float]:
+        margin = z * self.std_error
+        return self._elo(self.mean_score - margin), self._elo(self.mean_score + margin)
+
+
+def _seat_players(first: PlayerFactory, second: PlayerFactory, names: tuple[str, str],
+                  rng: random.Random) -> list[Player]:
+    return [first(0, names[0], rng=random.Random(rng.getrandbits(64))),
+            second(1, names[1], rng=random.Random(rng.getrandbits(64)))]
+
+
+def _play_batch(a: Entrant, b: Entrant, seed: int, start: int, stop: int, max_rounds: int) -> list[float]:
+    """a's score in each of the pairing's games start..stop-1, seats alternating as described above"""
+    scores = []
+    for k in range(start, stop):
+        a_seat = k % 2
+        seated = (a, b) if a_seat == 0 else (b, a)
+        factory = partial(_seat_players, seated[0].factory, seated[1].factory, (seated[0].name, seated[1].name))
+        winners = simulate_game(0, factory, seed + k // 2, max_rounds).winners
+        scores.append(1 / len(winners) if a_seat in winners else 0.0)
+    return scores
+
+
+@dataclass
+class Tournament:
+    entrants: list[Entrant]
+    seed: int = 0
+    max_rounds: int = 3
+    min_games: int = 20
+    max_games: int = 200
+    batch_size: int = 10
+    z_stop: float = 3.0
+    workers: int | None = None
+    ratings: list[Rating] = field(default_factory=list, init=False)
+    pairings: dict[tuple[int, int], PairingStats] = field(default_factory=dict, init=False)
+    on_result: Callable[[PairingStats], None] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.batch_size % 2:
+            raise ValueError("batch_size must be even, so seats alternate within every batch")
+        self.ratings = [Rating() for _ in self.entrants]
+
+    def run_round_robin(self) -> "Tournament":
+        """Plays every pairing of entrants until it's settled or has max_games games"""
+        self._play([(a, b) for a in range(len(self.entrants)) for b in range(a + 1, len(self.entrants))])
+        return self
+
+    def run_swiss(self, rounds: int) -> "Tournament":
+        """Each round pairs entrants of adjacent rating, avoiding rematches where possible;
+        with an odd entrant count the lowest rated sits the round out"""
+        for _ in range(rounds):
+            self._play(self._swiss_pairs())
+        return self
+
+    def _swiss_pairs(self) -> list[tuple[int, int]]:
+        unpaired = sorted(range(len(self.entrants)), key=lambda i: -self.ratings[i].rating)
+        pairs = []
+        while len(unpaired) > 1:
+            a = unpaired.pop(0)
+            b = next((i for i in unpaired if (min(a, i), max(a, i)) not in self.pairings), unpaired[0])
+            unpaired.remove(b)
+            pairs.append((min(a, b), max(a, b)))
+        return pairs
+
+    def _play(self, pairs: list[tuple[int, int]]) -> None:
+        for pair in pairs:
+            stats = self.pairings.setdefault(pair, PairingStats(*pair))
+            stats.is_settled = False
+        targets = {pair: self.pairings[pair].game_cnt + self.max_games for pair in pairs}
+        with ProcessPoolExecutor(max_workers=self.workers or os.cpu_count() or 1) as pool:
+            running: dict[Future, tuple[tuple[int, int], int]] = {}
+            for pair in pairs:
+                self._submit(pool, running, pair, targets[pair])
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pair, _ = running.pop(future)
+                    self._record(pair, future.result())
+                    if not self.pairings[pair].is_settled:
+                        self._submit(pool, running, pair, targets[pair])
+
+    def _submit(self, pool: ProcessPoolExecutor, running: dict[Future, tuple[tuple[int, int], int]],
+                pair: tuple[int, int], target: int) -> None:
+        """Queues the pairing's next batch of games, unless its games up to target are all played or queued"""
+        start = self.pairings[pair].game_cnt + sum(cnt for p, cnt in running.values() if p == pair)
+        if start >= target:
+            return
+        stop = min(start + self.batch_size, target)
+        a, b = pair
+        future = pool.submit(_play_batch, self.entrants[a], self.entrants[b], self.seed, start, stop, self.max_rounds)
+        running[future] = (pair, stop - start)
+
+    def _record(self, pair: tuple[int, int], a_scores: list[float]) -> None:
+        stats = self.pairings[pair]
+        a, b = pair
+        for a_score in a_scores:
+            stats.add(a_score)
+            self.ratings[a], self.ratings[b] = (self.ratings[a].updated(self.ratings[b], a_score),
+                                                self.ratings[b].updated(self.ratings[a], 1 - a_score))
+        if stats.game_cnt >= self.min_games and abs(stats.z_score) >= self.z_stop:
+            stats.is_settled = True
+        if self.on_result is not None:
+            self.on_result(stats)
+
+    def standings(self) -> list[tuple[str, Rating]]:
+        return sorted(((e.name, r) for e, r in zip(self.entrants, self.ratings)), key=lambda t: -t[1].rating)
+
+    def report(self) -> str:
+        lines = [f"{'entrant':<20}{'rating':>8}{'95% interval':>18}{'games':>8}"]
+        for name, r in self.standings():
+            low, high = r.interval()
+            lines.append(f"{name:<20}{r.rating:>8.0f}{f'{low:.0f}..{high:.0f}':>18}{r.game_cnt:>8}")
+        lines.append('')
+        lines.append(f"{'pairing':<32}{'games':>7}{'W-L-T':>12}{'Elo diff':>10}{'95% interval':>18}")
+        for (a, b), stats in sorted(self.pairings.items()):
+            low, high = stats.elo_interval()
+            record = f"{stats.a_win_cnt}-{stats.b_win_cnt}-{stats.tie_cnt}"
+            settled = ' settled' if stats.is_settled else ''
+            lines.append(f"{self.entrants[a].name + ' v ' + self.entrants[b].name:<32}{stats.game_cnt:>7}"
+                         f"{record:>12}{stats.elo_diff:>+10.0f}{f'{low:+.0f}..{high:+.0f}':>18}{settled}")
+        return '\n'.join(lines)
@@ -0,0 +1,275 @@
+"""Win-probability estimates for live analysis: how likely a player is to win the game from a position, & by
+how much, from batched rollouts to the end of the game on the batch engine (batch.py; needs NumPy).
+Rollouts see both hands, as a spectator does, but reshuffle the deck for each rollout, as its order is hidden;
+later rounds are dealt at random. Moves come from BotPolicy ('bot') or RandomPolicy ('random').
+
+Positions are keyed by their Zobrist hash (which covers the deck's size but not its order), the scores so far,
+the dealer & max_rounds. An estimate's rollout totals are cached under its key in an EstimateCache, a bounded LRU
+cache whose entries also expire after a TTL, so repeated queries of a position, e.g. by many viewers, are served
+from the cache, & a query with a larger budget only plays the rollouts it's short by. Concurrent queries of a
+position share one set of rollouts: later callers wait for the first instead of playing their own.
+estimate_many plays every position's missing rollouts as one batch; with workers, the batch is split into chunks
+played across a process pool.
+
+Win probabilities count ties as half a win; their interval is the Wilson score interval. The margin is the player's
+final total minus their opponent's, with a normal interval."""
+
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Sequence
+
+from gamenacki.lostcitinacki.batch import BatchGames, BotPolicy, RandomPolicy
+from gamenacki.lostcitinacki.models.bitboard import BitState
+from gamenacki.lostcitinacki.models.game_state import GameState
+
+POLICIES = {'bot': BotPolicy, 'random': RandomPolicy}
+
+
+@dataclass
+class RolloutStats:
+    """Totals over rollout_cnt rollouts of one position: wins per player (ties split) & player 0's margins"""
+    rollout_cnt: int = 0
+    win_sums: tuple[float, float] = (0.0, 0.0)
+    margin_sum: float = 0.0
+    margin_sq_sum: float = 0.0
+
+    def merge(self, other: "RolloutStats") -> "RolloutStats":
+        return RolloutStats(self.rollout_cnt + other.rollout_cnt,
+                            (self.win_sums[0] + other.win_sums[0], self.win_sums[1] + other.win_sums[1]),
+                            self.margin_sum + other.margin_sum, self.margin_sq_sum + other.margin_sq_sum)
+
+
+@dataclass(frozen=True, slots=True)
+class WinEstimate:
+    p_idx: int
+    rollout_cnt: int
+    win_probability: float
+    win_interval: tuple[float, float]
+    expected_margin: float
+    margin_interval: tuple[float, float]
+
+    @classmethod
+    def from_stats(cls, stats: RolloutStats, p_idx: int, z: float = 1.96) -> "WinEstimate":
+        n = stats.rollout_cnt
+        p = stats.win_sums[p_idx] / n
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        sign = 1 if p_idx == 0 else -1
+        mean = stats.margin_sum / n
+        variance = (stats.margin_sq_sum - n * mean * mean) / (n - 1) if n > 1 else math.inf
+        margin_half_width = z * math.sqrt(max(variance, 0.0) / n)
+        return cls(p_idx, n, p, (max(center - half_width, 0.0), min(center + half_width, 1.0)), sign * mean,
+                   (sign * mean - margin_half_width, sign * mean + margin_half_width))
+
+
+@dataclass
+class EstimateCache:
+    """A thread-safe LRU cache of RolloutStats: at most max_size entries, each dropped ttl seconds after it was
+    last stored (never, with ttl None)"""
+    max_size: int = 10_000
+    ttl: float | None = 300.0
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    hit_cnt: int = 0
+    miss_cnt: int = 0
+    _entries: OrderedDict[Hashable, tuple[float, RolloutStats]] = field(default_factory=OrderedDict, init=False,
+                                                                         repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> RolloutStats | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self.clock() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.miss_cnt += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hit_cnt += 1
+            return entry[1]
+
+    def put(self, key: Hashable, stats: RolloutStats) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock(), stats)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def merge(self, key: Hashable, stats: RolloutStats) -> RolloutStats:
+        """Adds stats' rollouts to key's entry, or stores them if it has none (or it has expired), & returns the
+        entry; merging rather than overwriting keeps rollouts played concurrently for the same key"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or self.clock() - entry[0] <= self.ttl):
+                stats = entry[1].merge(stats)
+            self._entries[key] = (self.clock(), stats)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def state_key(gs: GameState, policy: str) -> tuple:
+    return (gs.zobrist_hash, tuple(ledger.total for ledger in gs.scorer.ledgers), gs.dealer.dealer_idx,
+            gs.max_rounds, policy)
+
+
+def _play_rollouts(states: list[BitState], copies: list[int], policy: str, seed: int) -> list[RolloutStats]:
+    """copies[i] rollouts of states[i] to the end of the game, as one batch"""
+    games = BatchGames.from_bit_states(states, copies, seed)
+    policy_obj = POLICIES[policy](games.rng)
+    games.run([policy_obj, policy_obj])
+    wins = games.winners / games.winners.sum(axis=1, keepdims=True)
+    margins = (games.scores[:, 0] - games.scores[:, 1]).astype(float)
+    stats, start = [], 0
+    for cnt in copies:
+        rows = slice(start, start + cnt)
+        start += cnt
+        stats.append(RolloutStats(cnt, (float(wins[rows, 0].sum()), float(wins[rows, 1].sum())),
+                                  float(margins[rows].sum()), float((margins[rows] ** 2).sum())))
+    return stats
+
+
+@dataclass
+class WinProbabilityEstimator:
+    """Reusable across queries & threads; workers 0 plays rollouts in-process, None uses a process per core.
+    Close it (or use it as a context manager) to shut its process pool down"""
+    policy: str = 'bot'
+    cache: EstimateCache = field(default_factory=EstimateCache)
+    workers: int | None = 0
+    chunk_size: int = 2000
+    seed: int | None = None
+    z: float = 1.96
+    _pool: ProcessPoolExecutor = field(default=None, init=False, repr=False)
+    _batch_cnt: int = field(default=0, init=False, repr=False)
+    _in_flight: dict[Hashable, Future] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown policy {self.policy!r}; choose from {', '.join(POLICIES)}")
+
+    def __enter__(self) -> "WinProbabilityEstimator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def estimate(self, gs: GameState, p_idx: int, budget: int = 1000) -> WinEstimate:
+        return self.estimate_many([gs], [p_idx], budget)[0]
+
+    def estimate_many(self, states: Sequence[GameState], p_idxs: Sequence[int], budget: int = 1000) -> list[WinEstimate]:
+        """An estimate from at least budget rollouts for each of states, as p_idxs[i] sees states[i].
+        A position whose rollouts another call is already playing isn't played again: this call waits for them,
+        then tops them up if they're short of budget"""
+        if budget < 2:
+            raise ValueError("budget must be at least 2 rollouts")
+        keys = [state_key(gs, self.policy) for gs in states]
+        by_key = dict(zip(keys, states))
+        for gs in by_key.values():
+            if gs.player_cnt != 2:
+                raise ValueError("Win probabilities are only estimated for two-player games")
+            if gs.is_round_over:
+                raise ValueError("The round is over; estimate from the next round's deal or the final scores")
+        stats: dict[Hashable, RolloutStats] = {}
+        pending = set(by_key)
+        while pending:
+            claimed, in_flight = {}, []
+            with self._lock:
+                for key in pending:
+                    cached = self.cache.get(key)
+                    missing = budget - (cached.rollout_cnt if cached else 0)
+                    if missing <= 0:
+                        stats[key] = cached
+                    elif key in self._in_flight:
+                        in_flight.append(self._in_flight[key])
+                    else:
+                        self._in_flight[key] = Future()
+                        claimed[key] = missing
+            try:
+                short = {key: (BitState.from_game_state(by_key[key]), missing) for key, missing in claimed.items()}
+                for key, new_stats in self._play(short).items():
+                    stats[key] = self.cache.merge(key, new_stats)
+            finally:
+                with self._lock:
+                    for key in claimed:
+                        self._in_flight.pop(key).set_result(None)
+            pending -= stats.keys()
+            wait(in_flight)
+        return [WinEstimate.from_stats(stats[key], p_idx, self.z) for key, p_idx in zip(keys, p_idxs)]
+
+    def _play(self, short: dict[Hashable, tuple[BitState, int]]) -> dict[Hashable, RolloutStats]:
+        """Plays the missing rollouts of every position, grouped by max_rounds as a batch shares it"""
+        results: dict[Hashable, RolloutStats] = {}
+        tasks = []
+        by_max_rounds: dict[int, list[tuple[Hashable, BitState, int]]] = {}
+        for key, (bs, missing) in short.items():
+            by_max_rounds.setdefault(bs.max_rounds, []).append((key, bs, missing))
+        for group in by_max_rounds.values():
+            chunk: list[tuple[Hashable, BitState, int]] = []
+            chunk_cnt = 0
+            for key, bs, missing in group:
+                while missing:
+                    cnt = min(missing, self.chunk_size - chunk_cnt)
+                    chunk.append((key, bs, cnt))
+                    chunk_cnt += cnt
+                    missing -= cnt
+                    if chunk_cnt == self.chunk_size:
+                        tasks.append(chunk)
+                        chunk, chunk_cnt = [], 0
+            if chunk:
+                tasks.append(chunk)
+        if self.workers == 0 or len(tasks) < 2:
+            outputs = [_play_rollouts([bs for _, bs, _ in task], [cnt for _, _, cnt in task], self.policy,
+                                      self._next_seed()) for task in tasks]
+        else:
+            pool = self._get_pool()
+            futures = [pool.submit(_play_rollouts, [bs for _, bs, _ in task], [cnt for _, _, cnt in task],
+                                   self.policy, self._next_seed()) for task in tasks]
+            outputs = [future.result() for future in futures]
+        for task, stats_list in zip(tasks, outputs):
+            for (key, _, _), stats in zip(task, stats_list):
+                results[key] = results[key].merge(stats) if key in results else stats
+        return results
+
+    def _next_seed(self) -> int | None:
+        """Batch k is seeded from (seed, k), so a seeded estimator's batches differ but are reproducible"""
+        if self.seed is None:
+            return None
+        with self._lock:
+            self._batch_cnt += 1
+            return random.Random(f'{self.seed}/{self._batch_cnt}').getrandbits(64)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers or os.cpu_count() or 1)
+            return self._pool
+
+
+_DEFAULT_ESTIMATOR = WinProbabilityEstimator()
+
+
+def estimate_win_probability(gs: GameState, p_idx: int, budget: int = 1000,
+                             estimator: WinProbabilityEstimator | None = None) -> WinEstimate:
+    """p_idx's chance of winning from gs & expected final margin, from at least budget rollouts; by default served
+    by a shared in-process estimator & its cache"""
+    return (estimator or _DEFAULT_ESTIMATOR).estimate(gs, p_idx, budget)
@@ -0,0 +1,26 @@
+import statistics
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from gamenacki.lostcitinacki.batch import BatchGames, BotPolicy
+from gamenacki.lostcitinacki.players import BotPlayer
+from gamenacki.lostcitinacki.simulation import simulate
+
+
+def test_bot_policy_matches_bot_player():
+    """BotPolicy is BotPlayer for many games at once, so the two engines' points & game lengths must agree to
+    within sampling error; a drift of a few points between the policies fails this"""
+    results = simulate(1000, lambda rng: [BotPlayer(i, str(i), pick_up_delay=0, rng=rng) for i in range(2)], seed=1)
+    points = [p for r in results for p in r.points]
+    turns = [r.turns for r in results]
+
+    games = BatchGames(20_000, seed=1)
+    policy = BotPolicy(games.rng)
+    games.run([policy, policy])
+
+    points_se = (statistics.variance(points) / len(points) + games.scores.var() / games.scores.size) ** 0.5
+    turns_se = (statistics.variance(turns) / len(turns) + games.turn_cnt.var() / len(games.turn_cnt)) ** 0.5
+    assert abs(statistics.mean(points) - games.scores.mean()) < 4 * points_se
+    assert abs(statistics.mean(turns) - games.turn_cnt.mean()) < 4 * turns_se
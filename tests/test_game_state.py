@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from gamenacki.lostcitinacki.models.bitboard import BitState
+from gamenacki.lostcitinacki.models.game_state import GameState
+from gamenacki.lostcitinacki.models.zobrist import MAX_PLAYERS
+
+
+def _random_turns(seed: int, player_cnt: int = 2):
+    """Yields a GameState after each random legal turn of a whole game, starting with the deal"""
+    rng = random.Random(seed)
+    gs = GameState.create_game_state(player_cnt, 3, rng)
+    yield gs
+    while not gs.is_game_over:
+        if gs.is_round_over:
+            gs.assign_points()
+            if gs.is_game_over:
+                break
+            gs.create_new_round()
+        else:
+            gs.apply(rng.choice(gs.legal_moves(gs.dealer.player_turn_idx)))
+        yield gs
+
+
+@pytest.mark.parametrize('player_cnt', [2, 3, 4])
+def test_incremental_hash_matches_rehash(player_cnt):
+    for seed in range(5):
+        for gs in _random_turns(seed, player_cnt):
+            incremental = gs.zobrist_hash
+            gs.rehash()
+            assert gs.zobrist_hash == incremental
+
+
+def test_undo_restores_hash():
+    rng = random.Random(1)
+    for gs in _random_turns(1):
+        if gs.is_round_over:
+            continue
+        before = gs.zobrist_hash
+        move = rng.choice(gs.legal_moves(gs.dealer.player_turn_idx))
+        gs.apply(move)
+        gs.undo(move)
+        assert gs.zobrist_hash == before
+
+
+def test_bit_state_bytes_round_trip():
+    for seed in range(3):
+        for gs in _random_turns(seed):
+            bs = BitState.from_game_state(gs)
+            restored = BitState.from_bytes(bs.to_bytes())
+            assert restored == bs
+            assert restored.to_game_state().zobrist_hash == gs.zobrist_hash
+
+
+@pytest.mark.parametrize('player_cnt', [0, 1, MAX_PLAYERS + 1])
+def test_unsupported_player_counts(player_cnt):
+    with pytest.raises(ValueError):
+        GameState.create_game_state(player_cnt, 3)
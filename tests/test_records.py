@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from gamenacki.lostcitinacki.players import BotPlayer
+from gamenacki.lostcitinacki.records import RecordWriter, iter_games
+from gamenacki.lostcitinacki.simulation import play_headless_game
+
+
+@pytest.mark.parametrize('suffix', ['.lcr', '.lcr.gz', '.jsonl', '.jsonl.xz'])
+def test_record_round_trip(tmp_path, suffix):
+    path = tmp_path / f'games{suffix}'
+    logged = []
+    with RecordWriter(path) as writer:
+        for seed in (1, 2, None):
+            rng = random.Random(seed)
+            players = [BotPlayer(i, str(i), pick_up_delay=0, rng=rng) for i in range(2)]
+            game = play_headless_game(players, rng=rng, seed=seed, sink=writer)
+            logged.append((seed, tuple(game.log.events)))
+    assert [(game.seed, game.events) for game in iter_games(path)] == logged
+
+
+def test_truncated_record_raises(tmp_path):
+    path = tmp_path / 'games.lcr'
+    with RecordWriter(path) as writer:
+        rng = random.Random(1)
+        play_headless_game([BotPlayer(i, str(i), pick_up_delay=0, rng=rng) for i in range(2)], rng=rng, sink=writer)
+    path.write_bytes(path.read_bytes()[:-20])
+    with pytest.raises(ValueError):
+        list(iter_games(path))